@@ -1,33 +1,193 @@
-from skyfield.api import load, Star, load_constellation_names
-import pandas as pd
+import numpy as np
 import os
+import sys
+from time import perf_counter
+from star_field import StarField
+from utils.logger import setup_logger
 
-ephemeris = load('de421.bsp')
-earth = ephemeris['earth']
+logger = setup_logger()
+
+# Skyfield and pandas are imported where they are first needed, and the
+# ephemeris and timescale are loaded on first use, so importing this module
+# (and gui, which depends on it) stays cheap at startup.
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+SKYFIELD_DATA_DIR = os.path.join(BASE_DIR, 'data', 'skyfield')
+EPHEMERIS_FILE = 'de421.bsp'
+
+_ephemeris = None
+_timescale = None
+
+# The batch engine runs the same Skyfield pipeline as get_star_position, so
+# the two agree to within floating point rounding; this is the bound we hold
+# them to, in degrees of altitude and azimuth.
+POSITION_TOLERANCE_DEG = 1e-6
+
+def _find_ephemeris_file():
+    """Locate the bundled ephemeris; the working directory is checked as a fallback."""
+    for directory in (SKYFIELD_DATA_DIR, os.getcwd()):
+        path = os.path.join(directory, EPHEMERIS_FILE)
+        if os.path.exists(path):
+            return path
+    raise FileNotFoundError(
+        f"Ephemeris {EPHEMERIS_FILE} not found in {SKYFIELD_DATA_DIR}; "
+        f"download it once from https://ssd.jpl.nasa.gov/ftp/eph/planets/bsp/ "
+        f"and place it there"
+    )
+
+def get_ephemeris():
+    """Return the planetary ephemeris, loading it from local disk on first use."""
+    global _ephemeris
+    if _ephemeris is None:
+        from skyfield.api import load_file
+        _ephemeris = load_file(_find_ephemeris_file())
+    return _ephemeris
+
+def get_earth():
+    """Return the Earth body from the ephemeris."""
+    return get_ephemeris()['earth']
+
+def get_timescale():
+    """Return a timescale built from Skyfield's bundled data, never the network."""
+    global _timescale
+    if _timescale is None:
+        from skyfield.api import load
+        _timescale = load.timescale(builtin=True)
+    return _timescale
+
+CATALOG_COLUMNS = ['name', 'ra', 'dec', 'mag']
+# Optional B-V colour index column, under any of these headers; it is
+# loaded as 'bv'
+COLOR_INDEX_COLUMNS = ('bv', 'b_v', 'B-V')
+# Rows parsed per chunk while streaming a catalog; with the four catalog
+# columns a chunk of this size takes on the order of 100 MB
+CATALOG_CHUNK_ROWS = 500000
+# Names are stored as a categorical when at most this share of them is
+# distinct, as with exports full of blank or shared labels; unique names
+# would only gain a lookup table
+CATEGORICAL_NAME_RATIO = 0.5
+
+def _peak_memory_mb():
+    """Peak resident memory of this process in MB, or None where unknown."""
+    try:
+        import resource
+    except ImportError:  # Windows
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Reported in bytes on macOS and kilobytes elsewhere
+    return peak / (1024 * 1024) if sys.platform == 'darwin' else peak / 1024
+
+def _filter_catalog_chunk(chunk, max_magnitude, min_dec, max_dec):
+    """Downcast one parsed chunk and keep the rows that pass the filters."""
+    import pandas as pd
+
+    for column in chunk.columns.drop('name'):
+        # Unparseable values become NaN and are reported when positions are computed
+        chunk[column] = pd.to_numeric(chunk[column], errors='coerce').astype(np.float32)
+    keep = np.ones(len(chunk), dtype=bool)
+    if max_magnitude is not None:
+        keep &= (chunk['mag'] <= max_magnitude).to_numpy()
+    if min_dec is not None:
+        keep &= (chunk['dec'] >= min_dec).to_numpy()
+    if max_dec is not None:
+        keep &= (chunk['dec'] <= max_dec).to_numpy()
+    return chunk[keep]
+
+def load_star_catalog(filepath, max_magnitude=None, min_dec=None, max_dec=None,
+                      chunk_rows=CATALOG_CHUNK_ROWS, progress=None):
+    """Load star catalog from CSV file.
+
+    The file is streamed `chunk_rows` rows at a time and each chunk is
+    filtered before the next is read, so memory use is bounded by one chunk
+    plus the rows kept rather than by the file size. Stars fainter than
+    `max_magnitude` (or without a magnitude, when it is given) and outside
+    `min_dec`..`max_dec` degrees are dropped. Only the name, ra, dec and mag
+    columns are kept, plus a B-V colour index as 'bv' when the file has
+    one: numbers as float32, which holds coordinates to well under an
+    arcsecond, and names as a categorical when they repeat often enough for
+    that to save memory.
+
+    `progress(fraction)` is called after every chunk with the share of the
+    file read so far.
+    """
+    import pandas as pd
+    from pandas.api.types import union_categoricals
 
-def load_star_catalog(filepath):
-    """Load star catalog from CSV file."""
     if not os.path.exists(filepath):
         raise FileNotFoundError(f"Star catalog not found at: {filepath}")
-    
+
     try:
-        df = pd.read_csv(filepath)
-        required_columns = ['name', 'ra', 'dec', 'mag']
-        missing_columns = [col for col in required_columns if col not in df.columns]
-        if missing_columns:
-            raise ValueError(f"Missing required columns: {missing_columns}")
-        return df
+        header = pd.read_csv(filepath, nrows=0).columns
     except pd.errors.EmptyDataError:
         raise ValueError("Star catalog file is empty")
     except pd.errors.ParserError as e:
         raise ValueError(f"Error parsing star catalog: {e}")
+    missing_columns = [col for col in CATALOG_COLUMNS if col not in header]
+    if missing_columns:
+        raise ValueError(f"Missing required columns: {missing_columns}")
+    color_column = next((col for col in COLOR_INDEX_COLUMNS if col in header), None)
+    usecols = CATALOG_COLUMNS + ([color_column] if color_column else [])
+
+    start = perf_counter()
+    total_bytes = max(os.path.getsize(filepath), 1)
+    chunks = []
+    rows_read = 0
+    categorical = None
+    logged = 0.0
+    try:
+        with open(filepath, 'rb') as f:
+            reader = pd.read_csv(f, usecols=usecols, dtype={'name': str}, chunksize=chunk_rows)
+            for chunk in reader:
+                rows_read += len(chunk)
+                chunk = chunk[usecols].rename(columns={color_column: 'bv'})
+                chunk = _filter_catalog_chunk(chunk, max_magnitude, min_dec, max_dec)
+                # Chunks filtered down to nothing are dropped, so the name
+                # storage is decided on the first chunk that has rows
+                if len(chunk):
+                    if categorical is None:
+                        categorical = chunk['name'].nunique() <= CATEGORICAL_NAME_RATIO * len(chunk)
+                    if categorical:
+                        chunk = chunk.assign(name=chunk['name'].astype('category'))
+                    chunks.append(chunk)
+                fraction = min(f.tell() / total_bytes, 1.0)
+                if progress is not None:
+                    progress(fraction)
+                if fraction - logged >= 0.1 and fraction < 1.0:
+                    logger.info(f"Reading star catalog: {fraction:.0%}, {rows_read} rows")
+                    logged = fraction
+    except (pd.errors.EmptyDataError, pd.errors.ParserError) as e:
+        raise ValueError(f"Error parsing star catalog: {e}")
+
+    if chunks and categorical:
+        names = union_categoricals([chunk['name'] for chunk in chunks])
+        df = pd.concat([chunk.drop(columns='name') for chunk in chunks], ignore_index=True)
+        df.insert(0, 'name', names)
+    elif chunks:
+        df = pd.concat(chunks, ignore_index=True)
+    else:
+        df = pd.DataFrame({
+            'name': pd.Categorical([]),
+            **{column: np.array([], dtype=np.float32) for column in CATALOG_COLUMNS[1:]}
+        })
+        if color_column:
+            df['bv'] = np.array([], dtype=np.float32)
+
+    peak = _peak_memory_mb()
+    logger.info(
+        f"Loaded {len(df)} of {rows_read} stars from {os.path.basename(filepath)} "
+        f"in {perf_counter() - start:.1f} s; "
+        f"catalog {df.memory_usage(deep=True).sum() / 1e6:.1f} MB"
+        + (f", peak memory {peak:.0f} MB" if peak is not None else "")
+    )
+    return df
 
 def get_star_position(star_data, observer, time):
     """Calculate star position for given time and location."""
+    from skyfield.api import Star
+
     try:
         star = Star(ra_hours=star_data['ra'], dec_degrees=star_data['dec'])
         # Create observation from earth + observer's position at specific time
-        observation = (earth + observer).at(time)
+        observation = (get_earth() + observer).at(time)
         # Calculate star's position from the observation point
         astrometric = observation.observe(star)
         alt, az, distance = astrometric.apparent().altaz()
@@ -35,19 +195,345 @@ def get_star_position(star_data, observer, time):
     except Exception as e:
         raise ValueError(f"Error calculating star position: {e}")
 
+def _numeric_column(values):
+    """Return a column as float64, coercing unparseable entries to NaN."""
+    values = np.asarray(values)
+    if values.dtype.kind in 'fiu':
+        return values.astype(float)
+    import pandas as pd
+    return np.asarray(pd.to_numeric(values, errors='coerce'), dtype=float)
+
+def _catalog_arrays(catalog, rows=None):
+    """Extract name/ra/dec/mag arrays and flag rows unusable for computation.
+
+    `rows` optionally restricts the result to a slice of the catalog.
+    """
+    rows = slice(None) if rows is None else rows
+    names = np.asarray(catalog['name'], dtype=object)[rows]
+    ra = _numeric_column(np.asarray(catalog['ra'])[rows])
+    dec = _numeric_column(np.asarray(catalog['dec'])[rows])
+    mag = _numeric_column(np.asarray(catalog['mag'])[rows])
+
+    reasons = np.full(len(names), None, dtype=object)
+    reasons[~((dec >= -90.0) & (dec <= 90.0))] = "invalid declination"
+    reasons[~((ra >= 0.0) & (ra < 24.0))] = "invalid right ascension"
+    return names, ra, dec, mag, reasons
+
+def _color_index(catalog, rows=None):
+    """Return the catalog's B-V column as float64, or None when it has none."""
+    if 'bv' not in catalog:
+        return None
+    rows = slice(None) if rows is None else rows
+    return _numeric_column(np.asarray(catalog['bv'])[rows])
+
+def calculate_star_arrays(catalog, observer, time, rows=None):
+    """Calculate positions for the whole catalog in one vectorized pass.
+
+    Builds a single array-valued Star and evaluates the observer once, so
+    the cost is one Skyfield call instead of one per row. Returns a dict of
+    'name', 'az', 'alt' and 'mag' arrays (and 'bv' when the catalog has a
+    colour index) covering the rows that could be computed, plus 'failed',
+    a list of (name, reason) for the rows that could not. `rows` optionally
+    restricts the work to a slice of the catalog.
+    """
+    return _star_arrays(catalog, observer, time, rows)[0]
+
+def _star_arrays(catalog, observer, time, rows=None):
+    """calculate_star_arrays() plus the mask of input rows it kept."""
+    from skyfield.api import Star
+
+    names, ra, dec, mag, reasons = _catalog_arrays(catalog, rows)
+    valid = np.equal(reasons, None)
+
+    az = np.full(len(names), np.nan)
+    alt = np.full(len(names), np.nan)
+    if valid.any():
+        try:
+            star = Star(ra_hours=ra[valid], dec_degrees=dec[valid])
+            observation = (get_earth() + observer).at(time)
+            alt_angle, az_angle, _ = observation.observe(star).apparent().altaz()
+        except Exception as e:
+            raise ValueError(f"Error calculating star positions: {e}")
+        az[valid] = az_angle.degrees
+        alt[valid] = alt_angle.degrees
+
+    computed = np.isfinite(az) & np.isfinite(alt)
+    reasons[valid & ~computed] = "position could not be computed"
+    failed = [(names[i], reasons[i]) for i in np.flatnonzero(~computed)]
+    result = {
+        'name': names[computed],
+        'az': az[computed],
+        'alt': alt[computed],
+        'mag': mag[computed],
+        'failed': failed,
+    }
+    bv = _color_index(catalog, rows)
+    if bv is not None:
+        result['bv'] = bv[computed]
+    return result, computed
+
+def calculate_apparent_vectors(catalog, observer, time, rows=None):
+    """Calculate apparent unit vectors for the whole catalog at one time.
+
+    These GCRS directions are what the observer's horizon rotation is
+    applied to in altaz(). They drift only slowly (aberration and light
+    deflection), so they can be reused for nearby times. Returns a dict
+    with 'name', 'mag', 'vectors' shaped (3, n_stars), 'failed', and the
+    observer's barycentric 'velocity' in AU/day, plus 'bv' as in
+    calculate_star_arrays. `rows` optionally
+    restricts the work to a slice of the catalog. An `observer` of None
+    observes from the Earth's centre.
+    """
+    from skyfield.api import Star
+
+    names, ra, dec, mag, reasons = _catalog_arrays(catalog, rows)
+    valid = np.equal(reasons, None)
+
+    vectors = np.full((3, len(names)), np.nan)
+    try:
+        site = get_earth() if observer is None else get_earth() + observer
+        observation = site.at(time)
+        if valid.any():
+            star = Star(ra_hours=ra[valid], dec_degrees=dec[valid])
+            xyz = observation.observe(star).apparent().xyz.au
+            vectors[:, valid] = xyz / np.linalg.norm(xyz, axis=0)
+    except Exception as e:
+        raise ValueError(f"Error calculating star positions: {e}")
+
+    computed = np.isfinite(vectors).all(axis=0)
+    reasons[valid & ~computed] = "position could not be computed"
+    failed = [(names[i], reasons[i]) for i in np.flatnonzero(~computed)]
+    result = {
+        'name': names[computed],
+        'mag': mag[computed],
+        'vectors': vectors[:, computed],
+        'failed': failed,
+        'velocity': observation.velocity.au_per_d,
+    }
+    bv = _color_index(catalog, rows)
+    if bv is not None:
+        result['bv'] = bv[computed]
+    return result
+
+def altaz_from_vectors(rotation, vectors):
+    """Rotate apparent unit vectors into the horizon frame; returns (az, alt) in degrees."""
+    x, y, z = rotation @ vectors
+    alt = np.degrees(np.arcsin(np.clip(z, -1.0, 1.0)))
+    az = np.degrees(np.arctan2(y, x)) % 360.0
+    return az, alt
+
+class ComputationCancelled(Exception):
+    """Raised by calculate_in_chunks when its caller asks it to stop."""
+
+# Result keys that hold one entry per catalog row (along the last axis) and
+# are therefore concatenated when results are computed in chunks
+_PER_ROW_KEYS = ('name', 'az', 'alt', 'mag', 'bv', 'vectors')
+
+def calculate_in_chunks(calculate, catalog, observer, time, chunk_size=20000,
+                        progress=None, cancelled=None):
+    """Run calculate_star_arrays or calculate_apparent_vectors over row chunks.
+
+    Splitting the catalog lets long computations report progress through
+    `progress(fraction)` and stop early when `cancelled()` returns True, in
+    which case ComputationCancelled is raised. The merged result has the
+    same layout as a single call.
+    """
+    chunks = []
+    total = len(catalog)
+    for start in range(0, max(total, 1), chunk_size):
+        if cancelled is not None and cancelled():
+            raise ComputationCancelled()
+        chunks.append(calculate(catalog, observer, time, rows=slice(start, start + chunk_size)))
+        if progress is not None:
+            progress(min(start + chunk_size, total) / max(total, 1))
+
+    merged = dict(chunks[0])
+    for key in _PER_ROW_KEYS:
+        if key in merged:
+            merged[key] = np.concatenate([chunk[key] for chunk in chunks], axis=-1)
+    merged['failed'] = [failure for chunk in chunks for failure in chunk['failed']]
+    return merged
+
+def report_failed_stars(failed, limit=5):
+    """Log one rate-limited warning summarizing rows that could not be computed."""
+    if not failed:
+        return
+    shown = ", ".join(f"{name} ({reason})" for name, reason in failed[:limit])
+    more = f" and {len(failed) - limit} more" if len(failed) > limit else ""
+    logger.warning(
+        f"Could not calculate positions for {len(failed)} stars: {shown}{more}",
+        extra={'rate_key': 'failed-stars'}
+    )
+
 def calculate_star_positions(catalog, observer, time):
-    """Calculate positions for all stars in catalog."""
-    positions = []
-    for _, star in catalog.iterrows():
+    """Calculate positions for all stars in catalog as a StarField."""
+    result = calculate_star_arrays(catalog, observer, time)
+    report_failed_stars(result['failed'])
+    return StarField.from_arrays(result)
+
+def calculate_star_positions_over_time(catalog, observer, times):
+    """Calculate positions for the whole catalog at every time in `times`.
+
+    `times` is a vector Time such as ``ts.utc(2026, 10, 18, 0, range(0, 1440, 5))``.
+    The catalog is built into one array-valued Star once, and each epoch
+    observes all of it in a single call through Skyfield's public
+    observe()/apparent()/altaz() API. Returns a dict like
+    calculate_star_arrays but with 'az' and 'alt' shaped (n_stars, n_times).
+    """
+    if not times.shape:
+        raise ValueError("Expected a vector of times, got a single time")
+
+    from skyfield.api import Star
+
+    names, ra, dec, mag, reasons = _catalog_arrays(catalog)
+    valid = np.equal(reasons, None)
+
+    n_times = len(times)
+    az = np.full((len(catalog), n_times), np.nan)
+    alt = np.full((len(catalog), n_times), np.nan)
+    if valid.any():
         try:
-            az, alt = get_star_position(star, observer, time)
-            positions.append({
-                'name': star['name'],
-                'az': az,
-                'alt': alt,
-                'mag': star['mag']
-            })
+            star = Star(ra_hours=ra[valid], dec_degrees=dec[valid])
+            site = get_earth() + observer
+            for j in range(n_times):
+                observation = site.at(times[j])
+                alt_angle, az_angle, _ = observation.observe(star).apparent().altaz()
+                az[valid, j] = az_angle.degrees
+                alt[valid, j] = alt_angle.degrees
         except Exception as e:
-            print(f"Warning: Could not calculate position for star {star['name']}: {e}")
-            continue
-    return positions
+            raise ValueError(f"Error calculating star positions: {e}")
+
+    computed = np.isfinite(az).all(axis=1) & np.isfinite(alt).all(axis=1)
+    reasons[valid & ~computed] = "position could not be computed"
+    failed = [(names[i], reasons[i]) for i in np.flatnonzero(~computed)]
+    return {
+        'name': names[computed],
+        'az': az[computed],
+        'alt': alt[computed],
+        'mag': mag[computed],
+        'failed': failed,
+    }
+
+def _site_axes(latitudes, longitudes):
+    """North, east and up unit vectors in ITRS for each geodetic site, each (n_sites, 3)."""
+    lat = np.radians(latitudes)
+    lon = np.radians(longitudes)
+    sin_lat, cos_lat = np.sin(lat), np.cos(lat)
+    sin_lon, cos_lon = np.sin(lon), np.cos(lon)
+    north = np.stack([-sin_lat * cos_lon, -sin_lat * sin_lon, cos_lat], axis=1)
+    east = np.stack([-sin_lon, cos_lon, np.zeros_like(lon)], axis=1)
+    up = np.stack([cos_lat * cos_lon, cos_lat * sin_lon, sin_lat], axis=1)
+    return north, east, up
+
+def _site_arrays(latitudes, longitudes):
+    latitudes = np.atleast_1d(np.asarray(latitudes, dtype=float))
+    longitudes = np.atleast_1d(np.asarray(longitudes, dtype=float))
+    if latitudes.shape != longitudes.shape or latitudes.ndim != 1:
+        raise ValueError("latitudes and longitudes must be 1-D arrays of the same length")
+    return latitudes, longitudes
+
+def _site_chunks(n_sites, n_stars, max_elements):
+    """Slices of sites sized so one chunk holds at most `max_elements` site-star pairs."""
+    step = max(1, max_elements // max(n_stars, 1))
+    for start in range(0, n_sites, step):
+        yield slice(start, min(start + step, n_sites))
+
+def geocentric_itrs_vectors(catalog, time, chunk_size=20000):
+    """Apparent geocentric star directions rotated into the Earth-fixed frame.
+
+    Returns calculate_apparent_vectors' dict with 'vectors' in ITRS. Every
+    site shares them: for stars, the observer's offset from the Earth's
+    centre only matters through diurnal aberration, under 0.33 arcseconds.
+    """
+    from skyfield.framelib import itrs
+
+    result = calculate_in_chunks(calculate_apparent_vectors, catalog, None, time, chunk_size)
+    result['vectors'] = itrs.rotation_at(time) @ result['vectors']
+    return result
+
+def iter_site_altaz(vectors, latitudes, longitudes, max_elements=1000000):
+    """Yield (sites, az, alt) for chunks of sites.
+
+    `vectors` are Earth-fixed star directions shaped (3, n_stars), as in
+    the result of geocentric_itrs_vectors. `sites` is the slice of the
+    site arrays the chunk covers; az and alt are float32 degrees shaped
+    (chunk_sites, n_stars). Chunks hold at most `max_elements` pairs.
+    """
+    latitudes, longitudes = _site_arrays(latitudes, longitudes)
+    for sites in _site_chunks(len(latitudes), vectors.shape[1], max_elements):
+        north, east, up = _site_axes(latitudes[sites], longitudes[sites])
+        alt = np.degrees(np.arcsin(np.clip(up @ vectors, -1.0, 1.0)))
+        az = np.degrees(np.arctan2(east @ vectors, north @ vectors)) % 360.0
+        yield sites, az.astype(np.float32), alt.astype(np.float32)
+
+def calculate_site_altaz(catalog, latitudes, longitudes, time, max_elements=1000000):
+    """Calculate alt/az for the whole catalog from many sites at one time.
+
+    The catalog is observed once from the Earth's centre; each site then
+    only costs a projection onto its horizon axes, done for chunks of
+    sites at a time. Agrees with calculate_star_arrays for a single Topos
+    to well under an arcsecond. Returns a dict like calculate_star_arrays
+    but with 'az' and 'alt' as float32 arrays shaped (n_sites, n_stars).
+    Use iter_site_altaz directly to stream grids too large to hold.
+    """
+    latitudes, longitudes = _site_arrays(latitudes, longitudes)
+    result = geocentric_itrs_vectors(catalog, time)
+    vectors = result['vectors']
+
+    shape = (len(latitudes), vectors.shape[1])
+    az = np.empty(shape, dtype=np.float32)
+    alt = np.empty(shape, dtype=np.float32)
+    for sites, chunk_az, chunk_alt in iter_site_altaz(vectors, latitudes, longitudes, max_elements):
+        az[sites] = chunk_az
+        alt[sites] = chunk_alt
+    return {
+        'name': result['name'],
+        'az': az,
+        'alt': alt,
+        'mag': result['mag'],
+        'failed': result['failed'],
+    }
+
+def calculate_site_visibility(catalog, latitudes, longitudes, time, min_altitude=0.0,
+                              max_elements=1000000):
+    """Which stars stand above `min_altitude` degrees from each site at one time.
+
+    Like calculate_site_altaz, but only the altitude's sine is needed, so
+    no trigonometry is done per site-star pair. Returns a dict with 'name',
+    'mag', 'failed' and 'visible', a boolean array shaped (n_sites, n_stars).
+    """
+    latitudes, longitudes = _site_arrays(latitudes, longitudes)
+    result = geocentric_itrs_vectors(catalog, time)
+    vectors = result['vectors']
+
+    threshold = np.sin(np.radians(min_altitude))
+    visible = np.empty((len(latitudes), vectors.shape[1]), dtype=bool)
+    for sites in _site_chunks(len(latitudes), vectors.shape[1], max_elements):
+        _, _, up = _site_axes(latitudes[sites], longitudes[sites])
+        visible[sites] = up @ vectors > threshold
+    return {
+        'name': result['name'],
+        'mag': result['mag'],
+        'visible': visible,
+        'failed': result['failed'],
+    }
+
+def max_batch_deviation(catalog, observer, time, sample_size=20):
+    """Largest alt/az difference in degrees between the batch and per-star paths.
+
+    Checks up to `sample_size` evenly spaced rows; compare the result against
+    POSITION_TOLERANCE_DEG. Works with a DataFrame or a CompiledCatalog.
+    """
+    result, computed = _star_arrays(catalog, observer, time)
+    # Result entry i comes from catalog row rows[i]; names may repeat or be
+    # blank, so rows are matched by position rather than by name
+    rows = np.flatnonzero(computed)
+    _, ra, dec, _, _ = _catalog_arrays(catalog)
+    step = max(1, len(rows) // sample_size)
+    deviation = 0.0
+    for i in range(0, len(rows), step):
+        row = rows[i]
+        az, alt = get_star_position({'ra': ra[row], 'dec': dec[row]}, observer, time)
+        daz = abs((result['az'][i] - az + 180.0) % 360.0 - 180.0)
+        deviation = max(deviation, daz, abs(result['alt'][i] - alt))
+    return deviation
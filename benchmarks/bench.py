@@ -0,0 +1,203 @@
+"""Benchmarks for the compute and render hot paths, run on synthetic catalogs.
+
+Each benchmark runs for every requested catalog size: one untimed warm-up
+call, then the min/median/mean wall time over several timed repeats. Results are written as JSON;
+pass --baseline to compare against an earlier run and fail when any median
+regresses by more than --threshold.
+
+Example:
+    python benchmarks/bench.py --sizes 10 1000 100000 --output results.json
+    python benchmarks/bench.py --baseline results.json --threshold 0.25
+"""
+import argparse
+import json
+import os
+import platform
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BASE_DIR)
+
+import numpy as np
+
+DEFAULT_SIZES = [10, 1000, 100000, 1000000]
+DEFAULT_TIME = '2026-10-18T20:00'
+HOVER_LOOKUPS = 1000
+
+def generate_catalog(path, size, seed=0):
+    """Write a synthetic name,ra,dec,mag catalog with `size` rows to `path`.
+
+    Stars are spread uniformly over the sphere with a magnitude distribution
+    that grows towards faint stars like a real survey. The first rows reuse
+    the constellation star names so constellation drawing has work to do.
+    """
+    from constellations import constellation_star_names
+
+    rng = np.random.default_rng(seed)
+    ra = rng.uniform(0.0, 24.0, size)
+    dec = np.degrees(np.arcsin(rng.uniform(-1.0, 1.0, size)))
+    # Star counts rise roughly 3x per magnitude, so sample an exponential tail
+    mag = np.minimum(-1.5 + rng.exponential(1.0 / np.log(3.0), size), 21.0)
+
+    known = constellation_star_names()
+    names = [known[i] if i < len(known) else f"SYN{i:07d}" for i in range(size)]
+    with open(path, 'w') as f:
+        f.write("name,ra,dec,mag\n")
+        for row in zip(names, ra, dec, mag):
+            f.write("%s,%.6f,%.6f,%.3f\n" % row)
+
+def measure(fn, repeat, warmup=1):
+    """Run fn() `repeat` times and summarize the wall times in seconds.
+
+    The first `warmup` calls are not timed, so one-off costs such as imports,
+    cache compilation and first-touch page faults stay out of the numbers.
+    """
+    for _ in range(warmup):
+        fn()
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - start)
+    return {
+        'min_s': min(timings),
+        'median_s': statistics.median(timings),
+        'mean_s': statistics.fmean(timings),
+        'repeat': repeat,
+        'warmup': warmup
+    }
+
+def make_sky_map(catalog, when):
+    """Build an off-screen SkyMap with positions computed for `when`."""
+    import pygame
+    from astro_logic import get_timescale
+    from gui import SkyMap
+    from skyfield.api import Topos
+
+    pygame.init()
+    sky_map = SkyMap()
+    sky_map.catalog = catalog
+    sky_map.ts = get_timescale()
+    sky_map.observer = Topos(latitude_degrees=52.0, longitude_degrees=21.0)
+    sky_map.current_time = sky_map.ts.from_datetime(when)
+    if not sky_map.update_star_positions():
+        raise RuntimeError("Star positions could not be calculated")
+    return sky_map
+
+def run_size(size, when, repeat, workdir):
+    """Run every benchmark for one catalog size; returns {name: stats}."""
+    import pygame
+    from astro_logic import load_star_catalog, calculate_star_positions, get_timescale
+    from catalog_cache import open_star_catalog
+    from gui import WIDTH, HEIGHT
+    from skyfield.api import Topos
+
+    csv_path = os.path.join(workdir, f"catalog_{size}.csv")
+    generate_catalog(csv_path, size)
+    results = {}
+
+    results['load_star_catalog'] = measure(lambda: load_star_catalog(csv_path), repeat)
+    # The warm-up call compiles the cache, so only cache hits are timed
+    results['open_star_catalog_warm'] = measure(lambda: open_star_catalog(csv_path), repeat)
+
+    catalog = open_star_catalog(csv_path)
+    observer = Topos(latitude_degrees=52.0, longitude_degrees=21.0)
+    t = get_timescale().from_datetime(when)
+    results['calculate_star_positions'] = measure(
+        lambda: calculate_star_positions(catalog, observer, t), repeat)
+
+    sky_map = make_sky_map(catalog, when)
+    surface = pygame.Surface((WIDTH, HEIGHT))
+    map_area = pygame.Rect(0, 0, WIDTH, HEIGHT)
+    results['draw_stars'] = measure(lambda: sky_map._draw_stars(surface, map_area), repeat)
+    results['draw_constellations'] = measure(
+        lambda: sky_map._draw_constellations(surface, map_area), repeat)
+
+    # Hover hit-testing: building the index, then many lookups against it
+    def rebuild_index():
+        sky_map._hit_grid = None
+        sky_map._get_hit_grid(map_area)
+    results['hit_index_build'] = measure(rebuild_index, repeat)
+
+    rng = np.random.default_rng(1)
+    mouse = rng.integers(0, [WIDTH, HEIGHT], size=(HOVER_LOOKUPS, 2))
+    def hover():
+        for x, y in mouse:
+            sky_map._display_info(map_area, (int(x), int(y)))
+    stats = measure(hover, repeat)
+    stats['per_lookup_s'] = stats['median_s'] / HOVER_LOOKUPS
+    results['display_info_hover'] = stats
+    return results
+
+def compare(current, baseline, threshold):
+    """Return (name, size, baseline, current, ratio) for every regression."""
+    regressions = []
+    for name, by_size in current['results'].items():
+        for size, stats in by_size.items():
+            base = baseline.get('results', {}).get(name, {}).get(size)
+            if not base or base['median_s'] <= 0:
+                continue
+            ratio = stats['median_s'] / base['median_s']
+            if ratio > 1.0 + threshold:
+                regressions.append((name, size, base['median_s'], stats['median_s'], ratio))
+    return regressions
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the planetarium hot paths.")
+    parser.add_argument('--sizes', type=int, nargs='+', default=DEFAULT_SIZES,
+                        help="Synthetic catalog sizes to run")
+    parser.add_argument('--repeat', type=int, default=5, help="Repeats per benchmark")
+    parser.add_argument('--time', default=DEFAULT_TIME, help="Observation time, ISO 8601 UTC")
+    parser.add_argument('--output', default='benchmark_results.json', help="JSON results file")
+    parser.add_argument('--baseline', help="Earlier results file to compare against")
+    parser.add_argument('--threshold', type=float, default=0.2,
+                        help="Allowed slowdown of a median before it counts as a regression")
+    args = parser.parse_args(argv)
+    if args.repeat < 1:
+        parser.error("--repeat must be at least 1")
+
+    when = datetime.fromisoformat(args.time)
+    if when.tzinfo is None:
+        when = when.replace(tzinfo=timezone.utc)
+
+    report = {
+        'meta': {
+            'created': datetime.now(timezone.utc).isoformat(),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'observation_time': when.isoformat(),
+            'repeat': args.repeat
+        },
+        'results': {}
+    }
+    with tempfile.TemporaryDirectory() as workdir:
+        for size in args.sizes:
+            print(f"Benchmarking {size} stars...")
+            for name, stats in run_size(size, when, args.repeat, workdir).items():
+                report['results'].setdefault(name, {})[str(size)] = stats
+                print(f"  {name}: {stats['median_s'] * 1000:.3f} ms median")
+
+    with open(args.output, 'w') as f:
+        json.dump(report, f, indent=4)
+    print(f"Results written to {args.output}")
+
+    if args.baseline:
+        with open(args.baseline, 'r') as f:
+            baseline = json.load(f)
+        regressions = compare(report, baseline, args.threshold)
+        for name, size, base, current, ratio in regressions:
+            print(f"REGRESSION {name} @ {size}: {base * 1000:.3f} ms -> "
+                  f"{current * 1000:.3f} ms ({ratio:.2f}x)")
+        if regressions:
+            return 1
+        print(f"No regressions beyond {args.threshold:.0%} against {args.baseline}")
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
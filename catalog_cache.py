@@ -0,0 +1,250 @@
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+import uuid
+
+import numpy as np
+
+from astro_logic import load_star_catalog, CATALOG_CHUNK_ROWS
+from utils.logger import setup_logger
+
+logger = setup_logger()
+
+CACHE_FORMAT_VERSION = 4
+MANIFEST_NAME = 'manifest.json'
+
+def cache_dir_for(csv_path):
+    """Return the compiled-cache directory that belongs to a catalog CSV."""
+    root, _ = os.path.splitext(csv_path)
+    return root + '.cache'
+
+def _file_digest(path, chunk_size=1 << 20):
+    """SHA-256 of a file, read in chunks so large catalogs stay out of memory."""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+def _read_manifest(cache_dir):
+    try:
+        with open(os.path.join(cache_dir, MANIFEST_NAME), 'r') as f:
+            manifest = json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return None
+    if manifest.get('version') != CACHE_FORMAT_VERSION:
+        return None
+    return manifest
+
+def _write_manifest(cache_dir, manifest):
+    # Written last and swapped in atomically: a cache without a complete
+    # manifest is never considered valid.
+    tmp_path = os.path.join(cache_dir, MANIFEST_NAME + '.tmp')
+    with open(tmp_path, 'w') as f:
+        json.dump(manifest, f, indent=4)
+    os.replace(tmp_path, os.path.join(cache_dir, MANIFEST_NAME))
+
+def _write_text_column(cache_dir, column, values):
+    """Store a text column as fixed-width UTF-8 bytes, which can be memory-mapped."""
+    import pandas as pd
+
+    encoded = [str(v).encode('utf-8') if not pd.isna(v) else b'' for v in values]
+    width = max((len(b) for b in encoded), default=0)
+    np.save(os.path.join(cache_dir, f'{column}.npy'), np.array(encoded, dtype=f'S{max(width, 1)}'))
+
+def _catalog_filters(max_magnitude=None, min_dec=None, max_dec=None):
+    """The load_star_catalog filters a cache was built with, as stored in its manifest."""
+    return {'max_magnitude': max_magnitude, 'min_dec': min_dec, 'max_dec': max_dec}
+
+def _temporary_sibling(cache_dir):
+    """A new empty directory next to `cache_dir`, on the same file system."""
+    parent, name = os.path.split(os.path.abspath(cache_dir))
+    return tempfile.mkdtemp(prefix=f'.{name}.', dir=parent)
+
+def _unused_sibling(cache_dir):
+    """A path next to `cache_dir` that does not exist yet."""
+    parent, name = os.path.split(os.path.abspath(cache_dir))
+    return os.path.join(parent, f'.{name}.{uuid.uuid4().hex}.old')
+
+def _install_cache(build_dir, cache_dir, manifest):
+    """Swap a freshly built cache directory into place; returns the manifest
+    of the cache now installed.
+
+    A directory cannot be renamed over a non-empty one (on Windows, over any
+    existing one), so the old cache is first renamed to an unused sibling
+    path; processes that still have its files open keep reading them. If
+    the swap fails, e.g. because another process installed its cache in
+    between, ours is dropped and the installed one is used as long as it
+    was built from the same source with the same filters.
+    """
+    old_dir = _unused_sibling(cache_dir)
+    try:
+        try:
+            os.replace(cache_dir, old_dir)
+        except FileNotFoundError:
+            pass  # no old cache, or another process moved it first
+        os.replace(build_dir, cache_dir)
+    except OSError:
+        installed = _read_manifest(cache_dir)
+        if (installed is None or installed.get('filters') != manifest['filters']
+                or installed.get('source_sha256') != manifest['source_sha256']):
+            raise
+        return installed
+    finally:
+        # Both are gone after a successful swap; after a failed one, neither
+        # is wanted any more
+        shutil.rmtree(build_dir, ignore_errors=True)
+        shutil.rmtree(old_dir, ignore_errors=True)
+    return manifest
+
+def compile_catalog(csv_path, cache_dir=None, digest=None, filters=None,
+                    chunk_rows=CATALOG_CHUNK_ROWS, progress=None):
+    """Parse a catalog CSV once and write it out as per-column binary files.
+
+    `filters` are passed on to load_star_catalog, which streams the file, so
+    only the rows that pass them are ever held in memory and cached. The
+    files are written to a temporary sibling directory that then replaces
+    `cache_dir`, so other processes never see a half-written cache.
+    """
+    cache_dir = cache_dir or cache_dir_for(csv_path)
+    filters = filters or _catalog_filters()
+    df = load_star_catalog(csv_path, chunk_rows=chunk_rows, progress=progress, **filters)
+
+    build_dir = _temporary_sibling(cache_dir)
+    try:
+        manifest = _write_cache(build_dir, csv_path, df, digest, filters)
+    except BaseException:
+        shutil.rmtree(build_dir, ignore_errors=True)
+        raise
+    return _install_cache(build_dir, cache_dir, manifest)
+
+def _write_cache(cache_dir, csv_path, df, digest, filters):
+    """Write the columns of `df` and their manifest into `cache_dir`."""
+    import pandas as pd
+
+    columns = {}
+    for column in df.columns:
+        series = df[column]
+        if pd.api.types.is_numeric_dtype(series) and not pd.api.types.is_bool_dtype(series):
+            np.save(os.path.join(cache_dir, f'{column}.npy'), series.to_numpy())
+            columns[column] = 'numeric'
+        else:
+            _write_text_column(cache_dir, column, series.to_numpy(dtype=object))
+            columns[column] = 'text'
+
+    stat = os.stat(csv_path)
+    manifest = {
+        'version': CACHE_FORMAT_VERSION,
+        'source_size': stat.st_size,
+        'source_mtime_ns': stat.st_mtime_ns,
+        'source_sha256': digest or _file_digest(csv_path),
+        'rows': len(df),
+        'filters': filters,
+        'columns': columns,
+    }
+    _write_manifest(cache_dir, manifest)
+    return manifest
+
+def _ensure_compiled(csv_path, cache_dir, filters, chunk_rows, progress):
+    """Return a manifest for an up-to-date cache, rebuilding it if stale."""
+    def rebuild(digest=None):
+        return compile_catalog(csv_path, cache_dir, digest, filters, chunk_rows, progress)
+
+    stat = os.stat(csv_path)
+    manifest = _read_manifest(cache_dir)
+    if manifest is not None and manifest.get('filters') != filters:
+        return rebuild()  # built with other filters
+    if manifest is not None:
+        if (manifest['source_size'] == stat.st_size
+                and manifest['source_mtime_ns'] == stat.st_mtime_ns):
+            return manifest
+        # The file was touched; only rebuild if its content actually changed.
+        digest = _file_digest(csv_path)
+        if digest == manifest['source_sha256']:
+            manifest['source_mtime_ns'] = stat.st_mtime_ns
+            _write_manifest(cache_dir, manifest)
+            return manifest
+        return rebuild(digest)
+    return rebuild()
+
+class CompiledCatalog:
+    """Read-only star catalog backed by memory-mapped column files.
+
+    Columns are opened on first access only, so a run that needs ra/dec/mag
+    never pages in anything else, and pandas is not imported at all. Numeric columns come back as read-only
+    memory maps; text columns are memory-mapped fixed-width UTF-8, decoded
+    into object arrays with vectorized casts.
+    """
+
+    def __init__(self, cache_dir, manifest):
+        self.cache_dir = cache_dir
+        self.manifest = manifest
+        self._columns = {}
+
+    @property
+    def columns(self):
+        return list(self.manifest['columns'])
+
+    @property
+    def empty(self):
+        return len(self) == 0
+
+    def __len__(self):
+        return self.manifest['rows']
+
+    def __contains__(self, column):
+        return column in self.manifest['columns']
+
+    def __getitem__(self, column):
+        if column not in self._columns:
+            kind = self.manifest['columns'].get(column)
+            if kind is None:
+                raise KeyError(column)
+            if kind == 'numeric':
+                self._columns[column] = self._load_array(column)
+            else:
+                self._columns[column] = self._load_text(column)
+        return self._columns[column]
+
+    def _load_array(self, column):
+        path = os.path.join(self.cache_dir, f'{column}.npy')
+        # numpy cannot memory-map a zero-length array
+        return np.load(path, mmap_mode='r' if len(self) else None)
+
+    def _load_text(self, column):
+        raw = self._load_array(column)
+        if raw.view(np.uint8).max(initial=0) < 128:
+            # Plain ASCII, the usual case, decodes in one vectorized cast
+            text = raw.astype('U')
+        else:
+            text = np.char.decode(raw, 'utf-8')
+        return text.astype(object)
+
+    def to_dataframe(self, columns=None):
+        """Materialize the catalog (or a subset of its columns) as a DataFrame."""
+        import pandas as pd
+
+        columns = columns or self.columns
+        return pd.DataFrame({column: np.asarray(self[column]) for column in columns})
+
+def open_star_catalog(csv_path, max_magnitude=None, min_dec=None, max_dec=None,
+                      chunk_rows=CATALOG_CHUNK_ROWS, progress=None):
+    """Open a star catalog through its compiled cache, building it if needed.
+
+    The filters and `chunk_rows` are those of load_star_catalog; a cache
+    built with different filters is rebuilt. Falls back to parsing the CSV
+    into a DataFrame when the cache directory cannot be written.
+    """
+    if not os.path.exists(csv_path):
+        raise FileNotFoundError(f"Star catalog not found at: {csv_path}")
+
+    cache_dir = cache_dir_for(csv_path)
+    filters = _catalog_filters(max_magnitude, min_dec, max_dec)
+    try:
+        manifest = _ensure_compiled(csv_path, cache_dir, filters, chunk_rows, progress)
+    except OSError as e:
+        logger.warning(f"Could not use catalog cache at {cache_dir}: {e}")
+        return load_star_catalog(csv_path, chunk_rows=chunk_rows, progress=progress, **filters)
+    return CompiledCatalog(cache_dir, manifest)
@@ -1,4 +1,14 @@
 PLANETS = {
+    "Sun": {
+        "description": "The star at the centre of the Solar System",
+        "distance": 1.0,  # AU from Earth
+        "diameter": 1392700  # km
+    },
+    "Moon": {
+        "description": "Earth's only natural satellite",
+        "distance": 0.00257,
+        "diameter": 3475
+    },
     "Mercury": {
         "description": "The smallest and innermost planet in the Solar System",
         "distance": 0.387,  # AU
@@ -9,7 +19,31 @@ PLANETS = {
         "distance": 0.723,
         "diameter": 12104
     },
-    # Add more planets...
+    "Mars": {
+        "description": "The red planet, coloured by iron oxide dust on its surface",
+        "distance": 1.524,
+        "diameter": 6779
+    },
+    "Jupiter": {
+        "description": "Largest planet in the Solar System, a gas giant with dozens of moons",
+        "distance": 5.203,
+        "diameter": 139820
+    },
+    "Saturn": {
+        "description": "Gas giant best known for its bright ring system",
+        "distance": 9.537,
+        "diameter": 116460
+    },
+    "Uranus": {
+        "description": "Ice giant that rotates on its side, barely visible to the naked eye",
+        "distance": 19.19,
+        "diameter": 50724
+    },
+    "Neptune": {
+        "description": "Outermost planet, an ice giant only visible through a telescope",
+        "distance": 30.07,
+        "diameter": 49244
+    }
 }
 
 STARS = {
@@ -59,8 +93,3 @@ STARS = {
         "magnitude": 1.09
     }
 }
-
-# Move existing CONSTELLATIONS here from constellations.py
-CONSTELLATIONS = {
-    # ...existing constellation data...
-}
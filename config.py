@@ -26,6 +26,52 @@ class Config:
             'font': {
                 'size': 16,
                 'name': 'Arial'
+            },
+            'level_of_detail': {
+                'base_limiting_magnitude': 6.5,
+                'max_limiting_magnitude': 20.0,
+                'max_stars_per_frame': 5000
+            },
+            'incremental_update': {
+                'enabled': True,
+                'max_error_arcsec': 1.0,
+                'max_interval_days': 1.0
+            },
+            'performance': {
+                'history_frames': 600,
+                'summary_interval_seconds': 60,
+                'profile_frames': 300
+            },
+            'solar_system': {
+                'enabled': True,
+                'cache_entries': 64
+            },
+            'sky_cache': {
+                'enabled': True,
+                'time_resolution_seconds': 60,
+                'max_megabytes': 256,
+                'persist': False,
+                'directory': 'data/sky_cache',
+                'max_disk_entries': 64
+            },
+            'projection': {
+                'type': 'stereographic'
+            },
+            'catalog': {
+                'max_magnitude': None,
+                'min_declination': None,
+                'max_declination': None,
+                'chunk_rows': 500000
+            },
+            'star_sprites': {
+                'glow': True,
+                'color_buckets': 8,
+                'radius_step': 0.5,
+                'zoom_exponent': 0.25
+            },
+            'culling': {
+                'hide_below_horizon': True,
+                'margin_pixels': 10
             }
         }
         
@@ -35,6 +81,13 @@ class Config:
         except (FileNotFoundError, json.JSONDecodeError):
             self.config = self.DEFAULT_CONFIG
             self.save_config()
+        self._merge_defaults()
+
+    def _merge_defaults(self):
+        """Fill in sections and keys missing from config.json with their defaults,
+        so older files keep working and callers can index every setting."""
+        for section, defaults in self.DEFAULT_CONFIG.items():
+            self.config[section] = {**defaults, **self.config.get(section, {})}
     
     def save_config(self):
         with open('config.json', 'w') as f:
@@ -1,25 +1,122 @@
-CONSTELLATIONS = {
-    "Ursa Major": {
-        "description": "The Great Bear - one of the most recognizable northern constellations.",
-        "stars": ["Dubhe", "Merak", "Phecda", "Megrez", "Alioth", "Mizar", "Alkaid"]
-    },
-    "Orion": {
-        "description": "The Hunter - easily recognized by Orion's Belt.",
-        "stars": ["Betelgeuse", "Rigel", "Bellatrix", "Saiph", "Mintaka", "Alnilam", "Alnitak"]
-    }
-}
-
-def get_constellation_center(star_names, star_positions):
+import json
+import os
+
+import numpy as np
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+CONSTELLATION_LINES_FILE = os.path.join(BASE_DIR, 'data', 'constellation_lines.json')
+
+_constellations = {}
+
+def load_constellations(path=CONSTELLATION_LINES_FILE):
+    """Return the constellation figures keyed by name, reading the file once.
+
+    Each value has 'abbr', 'description' and 'lines', a list of polylines
+    given as star names to be joined in order.
+    """
+    constellations = _constellations.get(path)
+    if constellations is None:
+        with open(path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        constellations = {
+            entry['name']: {
+                'abbr': entry['abbr'],
+                'description': entry.get('description', ''),
+                'lines': entry['lines']
+            }
+            for entry in data['constellations']
+        }
+        _constellations[path] = constellations
+    return constellations
+
+def constellation_star_names(constellations=None):
+    """Return every star named in the figures, once each, in file order."""
+    if constellations is None:
+        constellations = load_constellations()
+    names = {}
+    for figure in constellations.values():
+        for line in figure['lines']:
+            names.update(dict.fromkeys(line))
+    return list(names)
+
+class ConstellationIndex:
+    """Constellation figures resolved to star indices in one StarField.
+
+    Names are looked up once here; drawing then only gathers coordinates
+    through the index arrays. A polyline that runs through a star missing
+    from the catalog is split there, so figures degrade to the parts that
+    can be drawn. All polylines are concatenated into `flat`, with
+    polyline i occupying flat[bounds[i]:bounds[i + 1]].
+    """
+
+    def __init__(self, star_field, constellations=None):
+        if constellations is None:
+            constellations = load_constellations()
+        index = star_field.index
+        runs = []
+        owners = []
+        self.members = {}  # constellation name -> unique star indices
+        self.missing = set()
+
+        for name, figure in constellations.items():
+            found = []
+            for line in figure['lines']:
+                run = []
+                for star in line + [None]:  # None flushes the last run
+                    i = index.get(star) if star is not None else None
+                    if i is not None:
+                        run.append(i)
+                        found.append(i)
+                        continue
+                    if star is not None:
+                        self.missing.add(star)
+                    if len(run) > 1:
+                        runs.append(run)
+                        owners.append(name)
+                    run = []
+            if found:
+                self.members[name] = np.unique(found)
+
+        lengths = np.array([len(run) for run in runs], dtype=int)
+        self.bounds = np.concatenate(([0], np.cumsum(lengths)))
+        self.flat = np.array([i for run in runs for i in run], dtype=int)
+        self.owners = owners
+        # Segment k runs from flat[segment_starts[k]] to the next entry; the
+        # segments of polyline i are segment_starts[segment_bounds[i]:segment_bounds[i + 1]]
+        self.segment_starts = np.delete(np.arange(len(self.flat)), self.bounds[1:] - 1)
+        self.segment_bounds = self.bounds - np.arange(len(self.bounds))
+        # Names at the resolved positions, to check that a later StarField
+        # has the same layout and the index can be reused for it
+        self._size = len(star_field)
+        self._flat_names = star_field.names[self.flat]
+
+    def __len__(self):
+        """Number of drawable polylines."""
+        return len(self.owners)
+
+    def matches(self, star_field):
+        """True if `star_field` has the layout this index was resolved against."""
+        return (len(star_field) == self._size
+                and np.array_equal(star_field.names[self.flat], self._flat_names))
+
+    def center(self, name, star_field):
+        """Return the (az, alt) centre of a constellation's stars, or (0, 0).
+
+        The stars are averaged as unit vectors, so figures straddling
+        azimuth 0 are centred correctly.
+        """
+        indices = self.members.get(name)
+        if indices is None:
+            return 0, 0
+        az = np.radians(star_field.az[indices])
+        alt = np.radians(star_field.alt[indices])
+        x = np.mean(np.cos(alt) * np.cos(az))
+        y = np.mean(np.cos(alt) * np.sin(az))
+        z = np.mean(np.sin(alt))
+        return float(np.degrees(np.arctan2(y, x)) % 360.0), float(np.degrees(np.arctan2(z, np.hypot(x, y))))
+
+def get_constellation_center(name, star_field, index=None):
     """Calculate center point of constellation."""
-    xs, ys = [], []
-    star_pos_dict = {star['name']: (star['az'], star['alt']) for star in star_positions}
-    
-    for star in star_names:
-        if star in star_pos_dict:
-            az, alt = star_pos_dict[star]
-            xs.append(az)
-            ys.append(alt)
-    
-    if xs and ys:
-        return sum(xs)/len(xs), sum(ys)/len(ys)
-    return 0, 0
+    if index is None:
+        index = ConstellationIndex(star_field)
+    return index.center(name, star_field)
@@ -0,0 +1,44 @@
+import numpy as np
+
+def horizon_mask(alt, min_altitude=0.0):
+    """True where an object is at or above `min_altitude` degrees."""
+    with np.errstate(invalid='ignore'):
+        return np.asarray(alt) >= min_altitude
+
+def viewport_mask(xs, ys, bounds, margin=0):
+    """True where a screen point lies within `bounds` grown by `margin` pixels.
+
+    `bounds` is (left, top, right, bottom), inclusive; the margin lets
+    objects whose centre is just off-screen still draw their visible edge.
+    """
+    left, top, right, bottom = bounds
+    return ((xs >= left - margin) & (xs <= right + margin)
+            & (ys >= top - margin) & (ys <= bottom + margin))
+
+def rect_bounds(rect):
+    """Inclusive (left, top, right, bottom) bounds of a pygame Rect."""
+    return rect.left, rect.top, rect.right - 1, rect.bottom - 1
+
+def clip_segments(x0, y0, x1, y1, bounds):
+    """Clip line segments to `bounds` with the Liang-Barsky algorithm.
+
+    Works on whole arrays of segments at once. Returns the clipped end
+    points (x0, y0, x1, y1) as floats and a mask of the segments that
+    touch the bounds at all; the coordinates of the others are undefined.
+    """
+    left, top, right, bottom = bounds
+    x0, y0 = np.asarray(x0, dtype=float), np.asarray(y0, dtype=float)
+    dx, dy = np.asarray(x1, dtype=float) - x0, np.asarray(y1, dtype=float) - y0
+    t0 = np.zeros_like(x0)
+    t1 = np.ones_like(x0)
+    keep = np.ones(x0.shape, dtype=bool)
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        for p, q in ((-dx, x0 - left), (dx, right - x0), (-dy, y0 - top), (dy, bottom - y0)):
+            # Parallel to this edge and outside it: nothing to draw
+            keep &= ~((p == 0) & (q < 0))
+            r = q / p
+            t0 = np.where(p < 0, np.maximum(t0, r), t0)
+            t1 = np.where(p > 0, np.minimum(t1, r), t1)
+    keep &= t0 <= t1
+    return x0 + t0 * dx, y0 + t0 * dy, x0 + t1 * dx, y0 + t1 * dy, keep
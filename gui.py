@@ -1,20 +1,69 @@
 import pygame
 import sys
 import math
-from constellations import CONSTELLATIONS
+import time
+import numpy as np
 from config import Config
 from utils.logger import setup_logger
-from celestial_objects import PLANETS, CONSTELLATIONS, STARS
-from datetime import datetime
-from astro_logic import calculate_star_positions
-from skyfield.api import Topos
+from utils.perf_monitor import PerfMonitor
+from celestial_objects import PLANETS, STARS
+from datetime import datetime, timezone
+from astro_logic import calculate_star_arrays, calculate_in_chunks, report_failed_stars
+from star_field import StarField
+from spatial_index import ScreenGrid
+from text_cache import TextCache
+from render_layers import RenderLayer
+from incremental_sky import IncrementalSky
+from recompute_worker import RecomputeWorker
+from solar_system import SolarSystem, body_record
+from sky_cache import SkyStateCache
+from projection import PROJECTIONS, project, horizon_crossing
+from constellations import ConstellationIndex
+from culling import horizon_mask, viewport_mask, rect_bounds, clip_segments
+from star_sprites import StarAtlas
 import textwrap
 
 logger = setup_logger()
 config = Config()
+# Shared by SkyMap, Menu and StarInfoPopup so each label is rendered once
+text_cache = TextCache()
+
+# Frame and stage timings; F3 toggles the overlay, F4 profiles the next frames
+perf = PerfMonitor(
+    history=config.config['performance']['history_frames'],
+    summary_interval=config.config['performance']['summary_interval_seconds']
+)
+PERF_OVERLAY_REFRESH = 0.5  # seconds between overlay text updates
 
 WIDTH, HEIGHT = 800, 600
 BACKGROUND_COLOR = (0, 0, 20)
+HOVER_RADIUS = 10  # pixels between cursor and star centre that count as hovering
+REFERENCE_SCALE = 200  # projection scale of the default 800x600 window at zoom 1
+OFFSCREEN_COORD = -(1 << 20)  # screen position for points the projection cannot show
+PAN_MARGIN = 200  # extra pixels rendered around the map so small pans reuse the sky layers
+SPRITE_SCALE_STEP = 0.1  # sprite sizes change in steps this large as the view zooms
+BODY_COLORS = {
+    'Sun': (255, 230, 120),
+    'Moon': (220, 220, 210),
+    'Mercury': (190, 180, 170),
+    'Venus': (255, 245, 200),
+    'Mars': (230, 110, 70),
+    'Jupiter': (235, 205, 160),
+    'Saturn': (225, 200, 130),
+    'Uranus': (160, 220, 230),
+    'Neptune': (110, 140, 255)
+}
+BODY_RADII = {'Sun': 12, 'Moon': 10}  # pixels; planets are sized by magnitude
+
+def catalog_load_options():
+    """Keyword arguments for open_star_catalog from the 'catalog' config section."""
+    catalog_config = config.config['catalog']
+    return {
+        'max_magnitude': catalog_config['max_magnitude'],
+        'min_dec': catalog_config['min_declination'],
+        'max_dec': catalog_config['max_declination'],
+        'chunk_rows': catalog_config['chunk_rows']
+    }
 
 def init_pygame():
     """Initialize pygame and fonts system."""
@@ -66,12 +115,13 @@ class Menu:
         self.active_field = None
         self.settings_saved = False
 
+    @perf.timed('menu_draw')
     def draw(self, screen):
         if not self.active:
             # Draw menu button on right side
             pygame.draw.rect(screen, self.colors['highlight'], 
                            (WIDTH - 110, 10, 100, 30))
-            text = self.font.render("Menu", True, self.colors['text'])
+            text = text_cache.render(self.font, "Menu", self.colors['text'])
             screen.blit(text, (WIDTH - 85, 15))
             return
 
@@ -81,7 +131,7 @@ class Menu:
         
         # Draw close button
         pygame.draw.rect(screen, self.colors['text'], self.close_button)
-        close_text = self.font.render('×', True, (0, 0, 0))
+        close_text = text_cache.render(self.font, '×', (0, 0, 0))
         screen.blit(close_text, (self.close_button.x + 5, self.close_button.y))
 
         if self.current_category == 'Settings':
@@ -95,22 +145,22 @@ class Menu:
         # Draw input fields
         for field in self.input_fields.values():
             pygame.draw.rect(screen, self.colors['text'], field['rect'], 2)
-            label = self.font.render(field['label'], True, self.colors['text'])
-            value = self.font.render(field['value'], True, self.colors['text'])
+            label = text_cache.render(self.font, field['label'], self.colors['text'])
+            value = text_cache.render(self.font, field['value'], self.colors['text'])
             screen.blit(label, (field['rect'].x, field['rect'].y - 20))
             screen.blit(value, (field['rect'].x + 5, field['rect'].y + 5))
 
         # Draw save button
         save_button = pygame.Rect(WIDTH - 190, 280, 180, 30)
         pygame.draw.rect(screen, self.colors['highlight'], save_button)
-        save_text = self.font.render('Save Settings', True, self.colors['text'])
+        save_text = text_cache.render(self.font, 'Save Settings', self.colors['text'])
         screen.blit(save_text, (save_button.x + 40, save_button.y + 5))
 
     def _draw_about(self, screen):
         """Draw about section with program information."""
         # Draw back button
         pygame.draw.rect(screen, self.colors['highlight'], self.back_button)
-        back_text = self.font.render('Back', True, self.colors['text'])
+        back_text = text_cache.render(self.font, 'Back', self.colors['text'])
         screen.blit(back_text, (self.back_button.x + 5, self.back_button.y + 5))
 
         y_pos = 80
@@ -126,13 +176,16 @@ class Menu:
             "- Hover over stars for info",
             "- Menu for settings and",
             "  star selection",
+            "- F3 performance overlay",
+            "- F4 profile next frames",
+            "- F5 switch projection",
             "",
             "Version: 1.0",
             "© 2024 All rights reserved"
         ]
         
         for line in info_lines:
-            text = self.font.render(line, True, self.colors['text'])
+            text = text_cache.render(self.font, line, self.colors['text'])
             screen.blit(text, (self.menu_x + 10, y_pos))
             y_pos += 25
 
@@ -143,23 +196,33 @@ class Menu:
         # Draw back button if in category
         if self.current_category:
             pygame.draw.rect(screen, self.colors['highlight'], self.back_button)
-            back_text = self.font.render('Back', True, self.colors['text'])
+            back_text = text_cache.render(self.font, 'Back', self.colors['text'])
             screen.blit(back_text, (self.back_button.x + 5, self.back_button.y + 5))
             
             # Draw objects in current category
             for obj in self.objects[self.current_category]:
                 color = self.colors['highlight'] if obj == self.selected_object else self.colors['text']
-                text = self.font.render(obj, True, color)
+                text = text_cache.render(self.font, obj, color)
                 screen.blit(text, (self.menu_x + 20, y_pos))
                 y_pos += 30
         else:
             # Draw main categories
             for category in self.categories:
                 color = self.colors['highlight'] if category == self.current_category else self.colors['text']
-                text = self.font.render(category, True, color)
+                text = text_cache.render(self.font, category, color)
                 screen.blit(text, (self.menu_x + 20, y_pos))
                 y_pos += 30
 
+    def state(self):
+        """Hashable snapshot of everything that affects how the menu is drawn."""
+        return (
+            self.active,
+            self.current_category,
+            self.selected_object,
+            self.active_field,
+            tuple(field['value'] for field in self.input_fields.values())
+        )
+
     def handle_click(self, pos):
         if not self.active:
             if WIDTH - 110 <= pos[0] <= WIDTH - 10 and pos[1] < 40:
@@ -225,6 +288,7 @@ class StarInfoPopup:
         self.visible = False
         self.star_data = None
         self.position = (0, 0)
+        self.requested_position = None
         self.background_color = (0, 0, 50, 230)
         self.border_color = (255, 223, 0)
         self.text_wrap_length = 35  # Characters per line for description
@@ -239,10 +303,10 @@ class StarInfoPopup:
             if isinstance(line, list):  # Wrapped text
                 total_height += len(line) * self.line_spacing
                 for wrapped_line in line:
-                    text_surface = self.font.render(wrapped_line, True, (255, 255, 255))
+                    text_surface = text_cache.render(self.font, wrapped_line, (255, 255, 255))
                     max_line_width = max(max_line_width, text_surface.get_width())
             else:
-                text_surface = self.font.render(line, True, (255, 255, 255))
+                text_surface = text_cache.render(self.font, line, (255, 255, 255))
                 max_line_width = max(max_line_width, text_surface.get_width())
                 total_height += self.line_spacing
 
@@ -251,17 +315,24 @@ class StarInfoPopup:
 
     def show(self, star_data, position):
         self.star_data = star_data
+        self.requested_position = position
         
         # Prepare information lines
         info_lines = [
-            f"Star: {self.star_data['name']}",
+            f"{self.star_data.get('kind', 'Star')}: {self.star_data['name']}",
             f"Magnitude: {self.star_data['mag']:.2f}",
             f"Azimuth: {self.star_data['az']:.1f}°",
             f"Altitude: {self.star_data['alt']:.1f}°"
         ]
 
         # Add additional info if available
-        if self.star_data['name'] in STARS:
+        if 'phase' in self.star_data:
+            info_lines.append(f"Illuminated: {self.star_data['phase'] * 100:.0f}%")
+            info_lines.append(f"Distance: {self.star_data['distance_au']:.4f} AU")
+            if self.star_data['name'] in PLANETS:
+                info_lines.append(textwrap.wrap(PLANETS[self.star_data['name']]['description'],
+                                                width=self.text_wrap_length))
+        elif self.star_data['name'] in STARS:
             star_info = STARS[self.star_data['name']]
             info_lines.append(f"Distance: {star_info['distance']} ly")
             # Wrap description text
@@ -301,11 +372,11 @@ class StarInfoPopup:
         for line in self.info_lines:
             if isinstance(line, list):  # Wrapped description
                 for wrapped_line in line:
-                    text_surface = self.font.render(wrapped_line, True, (255, 255, 255))
+                    text_surface = text_cache.render(self.font, wrapped_line, (255, 255, 255))
                     popup_surface.blit(text_surface, (self.padding, y_offset))
                     y_offset += self.line_spacing
             else:
-                text_surface = self.font.render(line, True, (255, 255, 255))
+                text_surface = text_cache.render(self.font, line, (255, 255, 255))
                 popup_surface.blit(text_surface, (self.padding, y_offset))
                 y_offset += self.line_spacing
 
@@ -321,10 +392,28 @@ class SkyMap:
     def __init__(self):
         """Initialize the sky map with default settings and configuration."""
         self.zoom_factor = 1.0
-        self.star_positions = []
+        self.star_positions = StarField.empty()
+        self.positions_version = 0  # bumped whenever star_positions is replaced
+        self.positions_time = None
         self.font = None
         self._init_font()
         self.colors = config.config['colors']
+        self.lod = config.config['level_of_detail']
+        # Star labels get their own cache, sized so that a full frame of them
+        # plus the neighbours panned into view never evicts each other
+        self.label_cache = TextCache(max_entries=2 * self.lod['max_stars_per_frame'])
+        self.incremental = config.config['incremental_update']
+        self._position_engine = None
+        self.solar_system_config = config.config['solar_system']
+        # Sun, Moon and planets, cached per (observer, epoch)
+        self.solar_system = SolarSystem(self.solar_system_config['cache_entries'])
+        self.bodies = None
+        # Recently computed (stars, bodies) states, so flipping between saved
+        # sites and dates does not recompute them
+        self.sky_cache_config = config.config['sky_cache']
+        self._sky_cache = None
+        # Settings changes recompute on this worker so the event loop never blocks
+        self.worker = RecomputeWorker()
         
         # Remove description from main screen
         self.description = []  # Empty list instead of program info
@@ -339,6 +428,36 @@ class SkyMap:
         self.last_mouse_pos = None
         self.view_offset = [0, 0]  # [x, y] offset for panning
         self.star_info_popup = StarInfoPopup(self.font)
+        self._hit_grid = None
+        self._hit_grid_key = None
+        self._hit_bodies = None
+        self._constellation_index = None
+        self.culling = config.config['culling']
+        # (drawn, total) per kind of object in the last rendered sky layers
+        self.cull_counts = {}
+        self.star_sprites = config.config['star_sprites']
+        self._star_atlas = None
+        self._star_atlas_key = None
+
+        self.projection = config.config['projection']['type']
+        if self.projection not in PROJECTIONS:
+            logger.warning(f"Unknown projection {self.projection!r}; using stereographic")
+            self.projection = 'stereographic'
+        # Star and body positions projected to the unit horizon disc, shared by
+        # drawing and hit-testing until the positions or projection change
+        self._unit_coords = None
+        self._unit_coords_key = None
+
+        # Stars and constellation lines are rendered off-screen with a
+        # PAN_MARGIN border and only redrawn when their inputs change; the
+        # UI overlay is redrawn when the menu, hover or view label changes.
+        self.star_layer = RenderLayer()
+        self.constellation_layer = RenderLayer(transparent=True)
+        self.ui_layer = RenderLayer(transparent=True)
+        self._layer_origin = None
+        self._last_frame_key = None
+        self._perf_lines = None
+        self._perf_lines_time = 0.0
     
     def _init_font(self):
         """Initialize fonts with error handling."""
@@ -353,24 +472,157 @@ class SkyMap:
             logger.error(f"Font initialization failed: {e}")
             self.font = pygame.font.Font(None, config.config['font']['size'])
 
+    def _has_position_inputs(self):
+        if self.catalog is None or self.ts is None or self.observer is None or self.current_time is None:
+            logger.warning("Missing required data for star position calculation")
+            return False
+        return True
+
+    @perf.timed('compute_positions')
+    def _compute_positions(self, catalog, observer, time, progress=None, cancelled=None):
+        """Compute a magnitude-sorted StarField and the solar-system bodies.
+
+        Returns (stars, bodies); safe to call from the worker thread.
+        """
+        if self.incremental['enabled']:
+            stars = self._get_position_engine(catalog, observer).positions_at(time, progress, cancelled)
+        else:
+            result = calculate_in_chunks(
+                calculate_star_arrays, catalog, observer, time,
+                progress=progress, cancelled=cancelled
+            )
+            report_failed_stars(result['failed'])
+            stars = StarField.from_arrays(result)
+        return stars.sort_by_magnitude(), self._compute_bodies(observer, time)
+
+    @perf.timed('compute_bodies')
+    def _compute_bodies(self, observer, time):
+        """Return the body positions for `time`, or None when disabled or unavailable."""
+        if not self.solar_system_config['enabled']:
+            return None
+        try:
+            return self.solar_system.positions_at(observer, time)
+        except Exception as e:
+            # e.g. a time outside the ephemeris; the stars are still worth showing
+            logger.error(f"Error calculating solar system positions: {e}")
+            return None
+
+    def _get_sky_cache(self, catalog):
+        """Return the state cache for `catalog`, or None when caching is disabled."""
+        settings = self.sky_cache_config
+        if not settings['enabled']:
+            return None
+        cache = self._sky_cache
+        if cache is None or cache.catalog is not catalog:
+            cache = SkyStateCache(
+                catalog,
+                time_resolution=settings['time_resolution_seconds'],
+                max_bytes=settings['max_megabytes'] * 1024 * 1024,
+                cache_dir=settings['directory'] if settings['persist'] else None,
+                max_disk_entries=settings['max_disk_entries']
+            )
+            self._sky_cache = cache
+        return cache
+
+    def _cached_positions(self, cache, catalog, observer, time, progress=None, cancelled=None):
+        """Return (stars, bodies, time) from `cache`, computing and storing them on a miss.
+
+        A miss is computed at `time` itself and stored with it; later times
+        in the same slot reuse that state and its time.
+        """
+        if cache is None:
+            return (*self._compute_positions(catalog, observer, time, progress, cancelled), time)
+        key = cache.key(observer, time)
+        state = cache.load(key)
+        if state is None:
+            state = (*self._compute_positions(catalog, observer, time, progress, cancelled), time)
+            cache.store(key, *state)
+        return state
+
+    def _set_star_positions(self, stars, bodies=None, time=None):
+        self.star_positions = stars
+        self.bodies = bodies
+        self.positions_time = time  # the time the positions were computed for
+        self.positions_version += 1
+
+    @perf.timed('update_star_positions')
     def update_star_positions(self):
-        """Update star positions based on current settings."""
+        """Update star positions based on current settings, blocking until done."""
         try:
-            if self.catalog is None or self.ts is None or self.observer is None or self.current_time is None:
-                logger.warning("Missing required data for star position calculation")
+            if not self._has_position_inputs():
                 return False
 
-            self.star_positions = calculate_star_positions(
-                self.catalog, 
-                self.observer, 
-                self.current_time
-            )
+            self._set_star_positions(*self._cached_positions(
+                self._get_sky_cache(self.catalog), self.catalog, self.observer, self.current_time
+            ))
             logger.info(f"Calculated positions for {len(self.star_positions)} stars")
             return True
         except Exception as e:
             logger.error(f"Error calculating star positions: {e}")
-            self.star_positions = []
+            self._set_star_positions(StarField.empty())
+            return False
+
+    def request_star_positions(self):
+        """Recompute star positions on the background worker.
+
+        The current positions stay on screen until poll_star_positions()
+        picks up the result; a newer request supersedes an unfinished one.
+        """
+        if not self._has_position_inputs():
+            return False
+        catalog, observer, time = self.catalog, self.observer, self.current_time
+        cache = self._get_sky_cache(catalog)
+        state = cache.get(cache.key(observer, time)) if cache is not None else None
+        if state is not None:
+            # Still goes through the worker so it supersedes any job in flight
+            self.worker.submit(lambda progress, cancelled: state)
+        else:
+            self.worker.submit(
+                lambda progress, cancelled: self._cached_positions(
+                    cache, catalog, observer, time, progress, cancelled)
+            )
+        return True
+
+    def poll_star_positions(self):
+        """Publish a finished background computation, if any; call once per frame."""
+        finished = self.worker.poll()
+        if finished is None:
+            return False
+        _, result, error = finished
+        if error is not None:
+            # Keep showing the previous sky rather than blanking the map
+            logger.error(f"Error calculating star positions: {error}")
             return False
+        self._set_star_positions(*result)
+        logger.info(f"Calculated positions for {len(self.star_positions)} stars")
+        return True
+
+    def _progress_label(self):
+        if not self.worker.busy:
+            return None
+        return f"Computing star positions... {int(self.worker.progress * 100)}%"
+
+    @staticmethod
+    def _site_key(observer):
+        return (observer.latitude.degrees, observer.longitude.degrees, observer.elevation.m)
+
+    def _get_position_engine(self, catalog, observer):
+        """Return the incremental engine for the given catalog and observer.
+
+        Observers are matched by their coordinates, so saving unchanged
+        settings, which creates a new Topos, keeps the engine warm.
+        """
+        engine = self._position_engine
+        if (engine is None or engine.catalog is not catalog
+                or self._site_key(engine.observer) != self._site_key(observer)):
+            engine = IncrementalSky(
+                catalog,
+                observer,
+                self.incremental['max_error_arcsec'],
+                self.incremental['max_interval_days']
+            )
+            self._position_engine = engine
+        return engine
 
     def handle_menu_selection(self, selection):
         """Handle menu selections and update display accordingly."""
@@ -380,6 +632,8 @@ class SkyMap:
         category, item = selection
         
         if category == 'Settings' and item == 'Save Settings':
+            from skyfield.api import Topos
+
             try:
                 date_str = self.menu.input_fields['date']['value']
                 lat = float(self.menu.input_fields['latitude']['value'])
@@ -388,14 +642,13 @@ class SkyMap:
                 # Create observer
                 self.observer = Topos(latitude_degrees=lat, longitude_degrees=lon)
                 
-                # Parse date and create time object
-                date = datetime.strptime(date_str, "%Y-%m-%d")
+                # Parse date and create time object (Skyfield needs an aware datetime)
+                date = datetime.strptime(date_str, "%Y-%m-%d").replace(tzinfo=timezone.utc)
                 self.current_time = self.ts.from_datetime(date)
                 
-                # Update star positions
-                success = self.update_star_positions()
-                if success:
-                    logger.info("Settings saved and star positions updated successfully")
+                # Update star positions in the background
+                if self.request_star_positions():
+                    logger.info("Settings saved; recalculating star positions")
                 else:
                     logger.error("Failed to update star positions after settings change")
                 
@@ -411,10 +664,8 @@ class SkyMap:
             # Focus on selected star
             self.current_view = selection
             # Find the star and adjust zoom/position
-            for star in self.star_positions:
-                if star['name'] == item:
-                    self.zoom_factor = 2.0  # Zoom in on selected star
-                    break
+            if self.star_positions.index_of(item) is not None:
+                self.zoom_factor = 2.0  # Zoom in on selected star
 
     def handle_event(self, event):
         if event.type == pygame.MOUSEBUTTONDOWN:
@@ -439,12 +690,49 @@ class SkyMap:
                 self.view_offset[1] += dy
                 self.last_mouse_pos = event.pos
         elif event.type == pygame.KEYDOWN:
-            self.menu.handle_keydown(event)
+            if event.key == pygame.K_F3:
+                perf.toggle_overlay()
+            elif event.key == pygame.K_F4:
+                perf.start_profile(config.config['performance']['profile_frames'], logger)
+            elif event.key == pygame.K_F5:
+                self.cycle_projection()
+            else:
+                self.menu.handle_keydown(event)
+
+    def cycle_projection(self):
+        """Switch to the next sky projection."""
+        self.projection = PROJECTIONS[(PROJECTIONS.index(self.projection) + 1) % len(PROJECTIONS)]
+        logger.info(f"Projection: {self.projection}")
 
+    def invalidate(self):
+        """Force every layer to re-render on the next draw, e.g. after the
+        window was covered and exposed again."""
+        self.star_layer.invalidate()
+        self.constellation_layer.invalidate()
+        self.ui_layer.invalidate()
+        self._last_frame_key = None
+
+    def _pan_origin(self, sky_key):
+        """Return the pan offset the sky layers are rendered for.
+
+        It only moves when the sky itself changed or the view has been
+        panned further than PAN_MARGIN from it, so ordinary drags just blit
+        the cached layers at a shifted position.
+        """
+        origin = self._layer_origin
+        if (origin is None or origin[0] != sky_key
+                or abs(self.view_offset[0] - origin[1][0]) > PAN_MARGIN
+                or abs(self.view_offset[1] - origin[1][1]) > PAN_MARGIN):
+            self._layer_origin = (sky_key, tuple(self.view_offset))
+        return self._layer_origin[1]
+
+    @perf.timed('draw')
     def draw(self, screen, mouse_pos):
-        """Draw the sky map with all elements."""
-        screen.fill(self.colors['background'])
-        
+        """Draw the sky map with all elements.
+
+        Returns False without touching the screen when nothing has changed
+        since the previous call, so the caller can skip the display flip.
+        """
         # Calculate available space for star map
         map_area = pygame.Rect(
             0,
@@ -452,126 +740,446 @@ class SkyMap:
             WIDTH - (self.menu.menu_width if self.menu.active else 0),
             HEIGHT
         )
-        
-        # Draw within the available space
-        self._draw_stars(screen, map_area)
-        self._draw_constellations(screen, map_area)
-        self._draw_description(screen)
-        self._display_info(screen, mouse_pos)
-        self.menu.draw(screen)
-        
+
+        sky_key = (self.positions_version, self.projection, self.zoom_factor, map_area.size)
+        origin = self._pan_origin(sky_key)
+        shift = (self.view_offset[0] - origin[0], self.view_offset[1] - origin[1])
+        self._display_info(map_area, mouse_pos)
+        ui_key = (
+            self.menu.state(),
+            self.current_view,
+            self._progress_label(),
+            self._perf_overlay_lines(),
+            self.star_info_popup.visible and self.star_info_popup.star_data['name'],
+            self.star_info_popup.position
+        )
+
+        frame_key = (sky_key, origin, shift, ui_key)
+        if frame_key == self._last_frame_key:
+            return False
+        self._last_frame_key = frame_key
+
+        # Render the sky layers for the origin pan offset into a surface that
+        # extends PAN_MARGIN past the map on every side
+        layer_size = (map_area.width + 2 * PAN_MARGIN, map_area.height + 2 * PAN_MARGIN)
+        layer_area = pygame.Rect(PAN_MARGIN, PAN_MARGIN, map_area.width, map_area.height)
+        star_layer = self.star_layer.get(
+            (sky_key, origin), layer_size,
+            lambda surface: self._draw_sky(surface, layer_area, origin)
+        )
+        constellation_layer = self.constellation_layer.get(
+            (sky_key, origin), layer_size,
+            lambda surface: self._draw_constellations(surface, layer_area, origin)
+        )
+        ui_layer = self.ui_layer.get(ui_key, (WIDTH, HEIGHT), self._draw_ui)
+
+        screen.fill(self.colors['background'])
+        visible = pygame.Rect(PAN_MARGIN - shift[0], PAN_MARGIN - shift[1], map_area.width, map_area.height)
+        screen.blit(star_layer, map_area.topleft, visible)
+        screen.blit(constellation_layer, map_area.topleft, visible)
+        screen.blit(ui_layer, (0, 0))
+        return True
+
+    def _draw_ui(self, surface):
+        """Draw the UI overlay: description, hover popup, menu and view label."""
+        self._draw_description(surface)
+        self.star_info_popup.draw(surface)
+        self.menu.draw(surface)
+
         if self.current_view:
             text = f"Current view: {self.current_view[0]} - {self.current_view[1]}"
-            text_surface = self.font.render(text, True, self.colors['text'])
-            screen.blit(text_surface, (10, HEIGHT - 30))
+            text_surface = text_cache.render(self.font, text, self.colors['text'])
+            surface.blit(text_surface, (10, HEIGHT - 30))
+
+        progress = self._progress_label()
+        if progress:
+            text_surface = text_cache.render(self.font, progress, self.colors['text'])
+            surface.blit(text_surface, (10, HEIGHT - 55))
+
+        self._draw_perf_overlay(surface)
+
+    def _perf_overlay_lines(self):
+        """Overlay text, refreshed at most every PERF_OVERLAY_REFRESH seconds."""
+        if not perf.overlay_visible:
+            return None
+        now = time.perf_counter()
+        if self._perf_lines is None or now - self._perf_lines_time >= PERF_OVERLAY_REFRESH:
+            lines = perf.summary_lines() or ["Collecting frame timings..."]
+            if self.cull_counts:
+                lines.append("drawn: " + ", ".join(
+                    f"{name} {drawn}/{total}" for name, (drawn, total) in self.cull_counts.items()))
+            if self._sky_cache is not None:
+                stats = self._sky_cache.stats()
+                lines.append(f"sky cache: {stats['entries']} states, {stats['bytes'] / 1e6:.1f} MB, "
+                             f"hit rate {stats['hit_rate']:.0%}")
+            if perf.profiling:
+                lines.append("Profiling...")
+            self._perf_lines = tuple(lines)
+            self._perf_lines_time = now
+        return self._perf_lines
+
+    def _draw_perf_overlay(self, surface):
+        lines = self._perf_overlay_lines()
+        if not lines:
+            return
+        line_height = self.font.get_linesize()
+        panel = pygame.Surface((WIDTH - 220, line_height * len(lines) + 10), pygame.SRCALPHA)
+        panel.fill((0, 0, 0, 180))
+        for i, line in enumerate(lines):
+            panel.blit(text_cache.render(self.font, line, (0, 255, 0)), (5, 5 + i * line_height))
+        surface.blit(panel, (10, 10))
 
     def _draw_description(self, screen):
         """Draw program description at the top of the screen."""
         y_offset = 10
         for line in self.description:
-            text_surface = self.font.render(line, True, self.colors['text'])
+            text_surface = text_cache.render(self.font, line, self.colors['text'])
             screen.blit(text_surface, (10, y_offset))
             y_offset += 25
 
-    def _draw_stars(self, screen, map_area):
+    def limiting_magnitude(self, map_area):
+        """Faintest magnitude worth drawing at the current zoom and map size.
+
+        Magnifying the view by k spreads the stars over k^2 as many pixels,
+        so the limit deepens by 5*log10(k), as with a telescope.
+        """
+        scale = self._projection_scale(map_area)
+        limit = self.lod['base_limiting_magnitude'] + 5 * math.log10(scale / REFERENCE_SCALE)
+        return min(limit, self.lod['max_limiting_magnitude'])
+
+    def _visible_stars(self, map_area):
+        """Stars bright enough to draw at the current zoom, brightest first.
+
+        star_positions is kept sorted by magnitude, so this is a prefix of it
+        and its screen coordinates are a prefix of _screen_coords().
+        """
+        return self.star_positions.brighter_than(self.limiting_magnitude(map_area))
+
+    def _budget_stars(self, alt, xs, ys, bounds, margin=0):
+        """Indices of the stars to draw among magnitude-sorted candidates.
+
+        Culling to `bounds` comes before the max_stars_per_frame cap, so
+        the budget goes to the brightest stars actually in view and zooming
+        in shows deeper stars rather than fewer.
+        """
+        shown = np.flatnonzero(self._cull_mask(alt, xs, ys, bounds, margin))
+        return shown[:self.lod['max_stars_per_frame']]
+
+    def _projection_scale(self, map_area):
+        """Pixels per horizon radius at the current zoom."""
+        return min(map_area.width, map_area.height) / 3 * self.zoom_factor
+
+    def _projected(self):
+        """Return {'stars': (x, y), 'bodies': (x, y)} on the unit horizon disc.
+
+        This is the only place the trigonometry happens; it reruns when the
+        positions or the projection change, not when the view zooms or pans.
+        """
+        key = (self.positions_version, self.projection)
+        if self._unit_coords is None or key != self._unit_coords_key:
+            stars = self.star_positions
+            bodies = self._body_field()
+            self._unit_coords = {
+                'stars': project(stars.az, stars.alt, self.projection),
+                'bodies': project(bodies.az, bodies.alt, self.projection)
+            }
+            self._unit_coords_key = key
+        return self._unit_coords
+
+    def _to_screen(self, map_area, unit_coords, offset):
+        if offset is None:
+            offset = self.view_offset
+        center_x = map_area.x + map_area.width // 2 + offset[0]
+        center_y = map_area.y + map_area.height // 2 + offset[1]
+        scale = self._projection_scale(map_area)
+        x, y = unit_coords
+        # Floored rather than truncated, so a whole-pixel shift of the centre
+        # shifts every point by exactly that much
+        xs = np.floor(np.nan_to_num(center_x + x * scale, nan=OFFSCREEN_COORD))
+        ys = np.floor(np.nan_to_num(center_y + y * scale, nan=OFFSCREEN_COORD))
+        return xs.astype(int), ys.astype(int)
+
+    def _screen_coords(self, map_area, count=None, offset=None):
+        """Integer screen x/y arrays for the first `count` stars (all by default).
+
+        `offset` overrides the current pan offset, for rendering cached
+        layers. Points the projection cannot show land at OFFSCREEN_COORD.
+        """
+        x, y = self._projected()['stars']
+        return self._to_screen(map_area, (x[:count], y[:count]), offset)
+
+    def _body_screen_coords(self, map_area, offset=None):
+        """Integer screen x/y arrays for the solar-system bodies."""
+        return self._to_screen(map_area, self._projected()['bodies'], offset)
+
+    @perf.timed('draw_stars')
+    def _draw_stars(self, screen, map_area, offset=None):
         """Updated to use map_area for positioning"""
+        # Stars are the bottom, opaque layer of the frame
+        screen.fill(self.colors['background'])
         if not self.star_positions:
-            print("No star positions available")  # Debug print
+            logger.warning("No star positions available")
             return
-            
-        center_x = map_area.x + map_area.width // 2 + self.view_offset[0]
-        center_y = map_area.height // 2 + self.view_offset[1]
-        scale_factor = min(map_area.width, map_area.height) / 3
-        
-        for star in self.star_positions:
-            try:
-                # Convert coordinates to screen position
-                x = int(center_x + math.cos(math.radians(star['az'])) * scale_factor * self.zoom_factor)
-                y = int(center_y - math.sin(math.radians(star['alt'])) * scale_factor * self.zoom_factor)
-                
-                # Make stars more visible and scale size by magnitude
-                magnitude = float(star['mag'])
-                radius = max(3, 10 - magnitude)  # Larger base size
-                
-                # Draw the star
-                pygame.draw.circle(screen, (255, 255, 255), (x, y), radius)
-                
-                # Draw star name if zoomed in enough
-                if self.zoom_factor > 1.5:
-                    name_surface = self.font.render(star['name'], True, (255, 255, 0))
-                    screen.blit(name_surface, (x + 10, y - 10))
-                
-            except (ValueError, TypeError) as e:
-                print(f"Error drawing star {star.get('name', 'unknown')}: {e}")
-                continue
 
-    def _draw_constellations(self, screen, map_area):
+        stars = self._visible_stars(map_area)
+        xs, ys = self._screen_coords(map_area, len(stars), offset)
+        atlas = self._get_star_atlas()
+        drawn = self._budget_stars(stars.alt, xs, ys, screen.get_rect(), atlas.max_extent)
+        self.cull_counts['stars'] = (len(drawn), len(self.star_positions))
+        xs, ys = xs[drawn], ys[drawn]
+        # Sprites scale with magnitude and are tinted by colour index
+        bv = None if stars.bv is None else stars.bv[drawn]
+        batch = atlas.blit_list(atlas.sprite_ids(stars.mag[drawn], bv), xs, ys)
+
+        # Draw star names if zoomed in enough
+        if self.zoom_factor > 1.5:
+            for name, x, y in zip(stars.names[drawn], xs.tolist(), ys.tolist()):
+                batch.append((self.label_cache.render(self.font, name, (255, 255, 0)), (x + 10, y - 10)))
+        screen.blits(batch, doreturn=False)
+
+    def _get_star_atlas(self):
+        """Return the star sprites for the current zoom, rebuilding them only
+        when the zoom crosses a SPRITE_SCALE_STEP or the star colour changes."""
+        settings = self.star_sprites
+        scale = self.zoom_factor ** settings['zoom_exponent']
+        scale = min(max(round(scale / SPRITE_SCALE_STEP) * SPRITE_SCALE_STEP, 0.5), 2.5)
+        key = (scale, tuple(self.colors['star']))
+        if self._star_atlas is None or key != self._star_atlas_key:
+            self._star_atlas = StarAtlas(
+                scale=scale,
+                color=self.colors['star'],
+                color_buckets=settings['color_buckets'],
+                radius_step=settings['radius_step'],
+                glow=settings['glow']
+            )
+            self._star_atlas_key = key
+        return self._star_atlas
+
+    def _draw_sky(self, screen, map_area, offset=None):
+        """Draw the stars with the solar-system bodies on top of them."""
+        self._draw_stars(screen, map_area, offset)
+        self._draw_bodies(screen, map_area, offset)
+
+    def _body_field(self):
+        return StarField.from_arrays(self.bodies) if self.bodies is not None else StarField.empty()
+
+    @perf.timed('draw_bodies')
+    def _draw_bodies(self, screen, map_area, offset=None):
+        """Draw the Sun, Moon and planets with their names."""
+        bodies = self._body_field()
+        if not bodies:
+            return
+
+        xs, ys = self._body_screen_coords(map_area, offset)
+        drawn = np.flatnonzero(self._cull_mask(bodies.alt, xs, ys, screen.get_rect()))
+        self.cull_counts['bodies'] = (len(drawn), len(bodies))
+        for i in drawn:
+            name = bodies.names[i]
+            pos = (int(xs[i]), int(ys[i]))
+            radius = BODY_RADII.get(name, max(4.0, 7.0 - np.nan_to_num(bodies.mag[i], nan=3.0)))
+            pygame.draw.circle(screen, BODY_COLORS.get(name, (255, 255, 255)), pos, float(radius))
+            name_surface = text_cache.render(self.font, name, self.colors['text'])
+            screen.blit(name_surface, (pos[0] + radius + 4, pos[1] - 10))
+
+    @perf.timed('draw_constellations')
+    def _draw_constellations(self, screen, map_area, offset=None):
         """Draw constellation lines between stars"""
         if not self.star_positions:
             return
-            
-        center_x = map_area.x + map_area.width // 2 + self.view_offset[0]
-        center_y = map_area.height // 2 + self.view_offset[1]
-        scale_factor = min(map_area.width, map_area.height) / 3
-        
-        # Create a dictionary of star positions by name
-        star_positions = {star['name']: (
-            int(center_x + math.cos(math.radians(star['az'])) * scale_factor * self.zoom_factor),
-            int(center_y - math.sin(math.radians(star['alt'])) * scale_factor * self.zoom_factor)
-        ) for star in self.star_positions}
-        
-        # Draw lines for each constellation
-        for const_name, const_data in CONSTELLATIONS.items():
-            stars = const_data['stars']
-            for i in range(len(stars) - 1):
-                if stars[i] in star_positions and stars[i + 1] in star_positions:
-                    start_pos = star_positions[stars[i]]
-                    end_pos = star_positions[stars[i + 1]]
-                    pygame.draw.line(screen, (100, 100, 255), start_pos, end_pos, 1)
-
-    def _display_info(self, screen, mouse_pos):
-        """Display constellation and star information."""
+
+        index = self._get_constellation_index()
+        if not len(index):
+            return
+        # Only the figure stars are converted to screen coordinates
+        x, y = self._projected()['stars']
+        x, y = x[index.flat], y[index.flat]
+        xs, ys = self._to_screen(map_area, (x, y), offset)
+
+        starts = index.segment_starts
+        ends = starts + 1
+        alt = self.star_positions.alt[index.flat]
+        above = horizon_mask(alt)
+        keep = np.isfinite(x[starts]) & np.isfinite(x[ends])
+        sx0, sy0, sx1, sy1 = xs[starts], ys[starts], xs[ends], ys[ends]
+        if self.projection == 'orthographic':
+            # The hidden end of a segment crossing the horizon has no chart
+            # position; cut the segment where its arc meets the horizon
+            # (the chart's limb) so the visible part is still drawn
+            crossing = np.flatnonzero(above[starts] != above[ends])
+            if len(crossing):
+                az = self.star_positions.az[index.flat]
+                i, j = starts[crossing], ends[crossing]
+                cx, cy = self._to_screen(map_area, project(
+                    *horizon_crossing(az[i], alt[i], az[j], alt[j]), self.projection), offset)
+                hidden = ~above[i]
+                sx0[crossing[hidden]], sy0[crossing[hidden]] = cx[hidden], cy[hidden]
+                sx1[crossing[~hidden]], sy1[crossing[~hidden]] = cx[~hidden], cy[~hidden]
+                keep[crossing] = True
+        if self.culling['hide_below_horizon']:
+            # A segment crossing the horizon is still drawn up to its end,
+            # or up to the horizon where the projection cannot show the end
+            keep &= above[starts] | above[ends]
+        x0, y0, x1, y1, inside = clip_segments(sx0, sy0, sx1, sy1, rect_bounds(screen.get_rect()))
+        keep &= inside
+        self.cull_counts['lines'] = (int(keep.sum()), len(keep))
+
+        # Polylines with every segment wholly on screen go to pygame in one
+        # call; of the rest only the surviving, clipped segments are drawn
+        unclipped = keep & (x0 == xs[starts]) & (y0 == ys[starts]) & (x1 == xs[ends]) & (y1 == ys[ends])
+        whole = np.logical_and.reduceat(unclipped, index.segment_bounds[:-1])
+        points = list(zip(xs.tolist(), ys.tolist()))
+        bounds = index.bounds.tolist()
+        for i in np.flatnonzero(whole):
+            pygame.draw.lines(screen, (100, 100, 255), False, points[bounds[i]:bounds[i + 1]])
+
+        partial = keep & ~np.repeat(whole, np.diff(index.segment_bounds))
+        for k in np.flatnonzero(partial):
+            pygame.draw.line(screen, (100, 100, 255), (round(x0[k]), round(y0[k])),
+                             (round(x1[k]), round(y1[k])), 1)
+
+    def _get_constellation_index(self):
+        """Return the constellation figures resolved against star_positions.
+
+        Recomputed positions keep the catalog's layout, so the names are
+        only resolved again when a different catalog is loaded.
+        """
+        index = self._constellation_index
+        if index is None or not index.matches(self.star_positions):
+            index = ConstellationIndex(self.star_positions)
+            if index.missing:
+                logger.info(f"{len(index.missing)} constellation stars are not in the catalog")
+            self._constellation_index = index
+        return index
+
+    def _cull_mask(self, alt, xs, ys, bounds, margin=0):
+        """Mask of the objects worth drawing or hit-testing inside `bounds`.
+
+        Drops objects below the horizon (when configured) and those whose
+        screen position is beyond the bounds by more than the cull margin,
+        or `margin` when that is larger; points the projection cannot show
+        sit at OFFSCREEN_COORD and fail the bounds test too.
+        """
+        margin = max(margin, self.culling['margin_pixels'])
+        mask = viewport_mask(xs, ys, rect_bounds(bounds), margin)
+        if self.culling['hide_below_horizon']:
+            mask &= horizon_mask(alt)
+        return mask
+
+    def _get_hit_grid(self, map_area):
+        """Return the hover index and the stars it covers for the current view,
+        rebuilding it only when positions, zoom, pan or the map area change.
+
+        The bodies' screen positions are refreshed along with it.
+        """
+        origin = self._layer_origin[1] if self._layer_origin is not None else tuple(self.view_offset)
+        key = (self.positions_version, self.projection, self.zoom_factor,
+               tuple(self.view_offset), origin, tuple(map_area))
+        if self._hit_grid is None or key != self._hit_grid_key:
+            # Only stars that are actually drawn can be hovered: pick them as
+            # _draw_stars does for the sky layer rendered at `origin`, whose
+            # surface covers the map plus PAN_MARGIN on every side
+            stars = self._visible_stars(map_area)
+            xs, ys = self._screen_coords(map_area, len(stars), origin)
+            drawn = self._budget_stars(stars.alt, xs, ys, map_area.inflate(2 * PAN_MARGIN, 2 * PAN_MARGIN),
+                                       self._get_star_atlas().max_extent)
+            xs = xs[drawn] + (self.view_offset[0] - origin[0])
+            ys = ys[drawn] + (self.view_offset[1] - origin[1])
+            shown = self._cull_mask(stars.alt[drawn], xs, ys, map_area)
+            self._hit_grid = (ScreenGrid(xs[shown], ys[shown]), stars[drawn[shown]])
+            self._hit_grid_key = key
+            self._hit_bodies = None
+            if self.bodies is not None:
+                xs, ys = self._body_screen_coords(map_area)
+                hidden = ~self._cull_mask(self.bodies['alt'], xs, ys, map_area)
+                xs[hidden] = ys[hidden] = OFFSCREEN_COORD
+                self._hit_bodies = (xs, ys)
+        return self._hit_grid
+
+    @perf.timed('display_info')
+    def _display_info(self, map_area, mouse_pos):
+        """Update the star information popup for the star under the mouse."""
         if self.font is None:
-            print("Error: Font not initialized. Cannot display star info.")
+            logger.error("Font not initialized. Cannot display star info.")
             return
-            
-        for star in self.star_positions:
-            x = int(WIDTH/2 + math.cos(math.radians(star['az'])) * 200 * self.zoom_factor)
-            y = int(HEIGHT/2 - math.sin(math.radians(star['alt'])) * 200 * self.zoom_factor)
-            
-            # Check if mouse is near star
-            if math.hypot(mouse_pos[0] - x, mouse_pos[1] - y) < 10:
+
+        grid, stars = self._get_hit_grid(map_area)
+        # Bodies are drawn on top of the stars, so they take precedence
+        body = self._body_at(mouse_pos)
+        if body is not None:
+            record, (x, y) = body
+            popup = self.star_info_popup
+            if not (popup.visible and popup.star_data['name'] == record['name']
+                    and popup.requested_position == (x + 20, y - 20)):
+                popup.show(record, (x + 20, y - 20))
+            return
+
+        # Hit-test against the same screen coordinates _draw_stars uses
+        i = grid.nearest(mouse_pos[0], mouse_pos[1], HOVER_RADIUS)
+        if i is not None:
+            x, y = int(grid.xs[i]), int(grid.ys[i])
+            popup = self.star_info_popup
+            if not (popup.visible and popup.star_data['name'] == stars.names[i]
+                    and popup.requested_position == (x + 20, y - 20)):
                 # Show popup instead of simple text
-                self.star_info_popup.show(star, (x + 20, y - 20))
-                break
-        else:
+                popup.show(stars[i], (x + 20, y - 20))
+        elif self.star_info_popup.visible:
             self.star_info_popup.hide()
 
-        # Draw the popup if visible
-        self.star_info_popup.draw(screen)
+    def _body_at(self, mouse_pos):
+        """Return (record, screen position) of the body under the mouse, or None.
 
-    def export_view(self, filename):
-        """Export current view as PNG image."""
+        Uses the body positions cached by _get_hit_grid for the current view.
+        """
+        if self._hit_bodies is None:
+            return None
+        xs, ys = self._hit_bodies
+        dist_sq = (xs - mouse_pos[0]) ** 2 + (ys - mouse_pos[1]) ** 2
+        i = int(np.argmin(dist_sq))
+        if dist_sq[i] > HOVER_RADIUS ** 2:
+            return None
+        return body_record(self.bodies, i), (int(xs[i]), int(ys[i]))
+
+    def export_view(self, filename, surface=None):
+        """Export current view as PNG image.
+
+        Saves the display surface unless another `surface` is given, e.g. an
+        off-screen one in headless rendering.
+        """
         try:
-            pygame.image.save(pygame.display.get_surface(), filename)
+            pygame.image.save(surface or pygame.display.get_surface(), filename)
             logger.info(f"View exported to {filename}")
             return True
         except pygame.error as e:
             logger.error(f"Failed to export view: {e}")
             return False
 
-def main_loop(screen, sky_map):
+# Events after which the window contents must be redrawn even if nothing
+# in the sky map changed
+WINDOW_EXPOSE_EVENTS = tuple(
+    getattr(pygame, name) for name in ('VIDEOEXPOSE', 'WINDOWEXPOSED', 'WINDOWRESTORED')
+    if hasattr(pygame, name)
+)
+
+def main_loop(screen, sky_map, startup_timer=None):
     clock = pygame.time.Clock()
     running = True
     while running:
+        perf.frame_start()
         mouse_pos = pygame.mouse.get_pos()
+        sky_map.poll_star_positions()
         for event in pygame.event.get():
             if event.type == pygame.QUIT:
                 running = False
+            elif event.type in WINDOW_EXPOSE_EVENTS:
+                sky_map.invalidate()
             sky_map.handle_event(event)
         
-        sky_map.draw(screen, mouse_pos)
-        pygame.display.flip()
+        # Idle frames (nothing changed) skip both drawing and the flip
+        if sky_map.draw(screen, mouse_pos):
+            pygame.display.flip()
+            if startup_timer is not None:
+                startup_timer.finish(logger)
+        perf.frame_end(logger)
         clock.tick(30)
     
     pygame.quit()
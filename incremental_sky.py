@@ -0,0 +1,79 @@
+import numpy as np
+
+from astro_logic import (
+    calculate_apparent_vectors, calculate_in_chunks, altaz_from_vectors, get_earth,
+    report_failed_stars
+)
+from star_field import StarField
+
+C_AU_PER_DAY = 173.1446326846693  # speed of light
+ARCSEC_PER_RADIAN = 206264.80624709636
+
+class IncrementalSky:
+    """Star positions for one catalog and observer, updated incrementally.
+
+    A full Skyfield computation caches each star's apparent direction at a
+    reference epoch. Nearby times are then produced by rotating those cached
+    vectors into the observer's horizon frame at the new time: one 3x3 matrix
+    product for the whole catalog. The apparent directions themselves drift
+    mostly through aberration, so the on-sky error of reusing them is
+    estimated from the change in the observer's velocity since the reference
+    epoch. Once it exceeds `max_error_arcsec`, or the reference is older than
+    `max_interval_days`, the next call does a full recompute.
+    """
+
+    def __init__(self, catalog, observer, max_error_arcsec=1.0, max_interval_days=1.0):
+        self.catalog = catalog
+        self.observer = observer
+        self.max_error_arcsec = max_error_arcsec
+        self.max_interval_days = max_interval_days
+        self.reference = None
+        self.reference_time = None
+        self.full_recomputes = 0
+        self.incremental_updates = 0
+        self.last_error_arcsec = 0.0
+
+    @property
+    def failed(self):
+        """Rows the last full computation could not place, as (name, reason)."""
+        return self.reference['failed'] if self.reference else []
+
+    def estimate_error_arcsec(self, time):
+        """Upper estimate of the angular error of reusing the reference at `time`."""
+        velocity = (get_earth() + self.observer).at(time).velocity.au_per_d
+        delta_v = np.linalg.norm(velocity - self.reference['velocity'])
+        return delta_v / C_AU_PER_DAY * ARCSEC_PER_RADIAN
+
+    def _needs_recompute(self, time):
+        if self.reference is None:
+            return True
+        if abs(time.tt - self.reference_time.tt) > self.max_interval_days:
+            return True
+        self.last_error_arcsec = self.estimate_error_arcsec(time)
+        return self.last_error_arcsec > self.max_error_arcsec
+
+    def recompute(self, time, progress=None, cancelled=None):
+        """Run the full Skyfield pipeline and make `time` the new reference epoch."""
+        self.reference = calculate_in_chunks(
+            calculate_apparent_vectors, self.catalog, self.observer, time,
+            progress=progress, cancelled=cancelled
+        )
+        report_failed_stars(self.reference['failed'])
+        self.reference_time = time
+        self.last_error_arcsec = 0.0
+        self.full_recomputes += 1
+
+    def positions_at(self, time, progress=None, cancelled=None):
+        """Return a StarField for `time`, incrementally when within the error bound.
+
+        `progress` and `cancelled` are passed to calculate_in_chunks when a
+        full recompute is needed.
+        """
+        if self._needs_recompute(time):
+            self.recompute(time, progress, cancelled)
+        else:
+            self.incremental_updates += 1
+
+        rotation = self.observer.rotation_at(time)
+        az, alt = altaz_from_vectors(rotation, self.reference['vectors'])
+        return StarField(self.reference['name'], az, alt, self.reference['mag'], self.reference.get('bv'))
@@ -1,23 +1,28 @@
-from astro_logic import load_star_catalog, calculate_star_positions
-from gui import init_pygame, main_loop, SkyMap
-from skyfield.api import load, Topos
-from datetime import datetime
+from utils.startup_timer import StartupTimer
 import os
 import sys
 
 def main():
+    # Heavy modules (pygame, pandas, Skyfield) are imported inside the timed
+    # phases below so the startup report shows where time-to-first-frame goes.
+    timer = StartupTimer()
     try:
         # Get base directory
         base_dir = os.path.dirname(os.path.abspath(__file__))
         catalog_path = os.path.join(base_dir, 'data', 'star_catalog.csv')
         
         # Initialize Pygame and GUI
-        screen = init_pygame()
-        sky_map = SkyMap()
+        with timer.phase("Import GUI"):
+            from gui import init_pygame, main_loop, SkyMap, catalog_load_options
+        with timer.phase("Initialize window"):
+            screen = init_pygame()
+            sky_map = SkyMap()
         
         # Load star catalog and initialize
         try:
-            catalog = load_star_catalog(catalog_path)
+            with timer.phase("Load star catalog"):
+                from catalog_cache import open_star_catalog
+                catalog = open_star_catalog(catalog_path, **catalog_load_options())
             if catalog.empty:
                 raise ValueError("Star catalog is empty")
             sky_map.catalog = catalog
@@ -27,19 +32,27 @@ def main():
             sys.exit(1)
         
         # Set default time and location
-        ts = load.timescale()
+        with timer.phase("Load timescale"):
+            from astro_logic import get_timescale, get_ephemeris
+            from skyfield.api import Topos
+            ts = get_timescale()
         sky_map.ts = ts
         sky_map.observer = Topos(latitude_degrees=52.0, longitude_degrees=21.0)
         sky_map.current_time = ts.now()
         
+        with timer.phase("Load ephemeris"):
+            get_ephemeris()
+        
         # Calculate initial positions
-        if sky_map.update_star_positions():
+        with timer.phase("Calculate initial positions"):
+            updated = sky_map.update_star_positions()
+        if updated:
             print(f"Calculated positions for {len(sky_map.star_positions)} stars")  # Debug print
         else:
             print("Failed to calculate star positions")
         
         # Start the main loop
-        main_loop(screen, sky_map)
+        main_loop(screen, sky_map, startup_timer=timer)
         
     except Exception as e:
         print(f"An error occurred: {e}")
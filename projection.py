@@ -0,0 +1,51 @@
+import numpy as np
+
+PROJECTIONS = ('stereographic', 'azimuthal_equidistant', 'orthographic')
+# Projected radii are capped here so points near the nadir, which
+# stereographic sends towards infinity, stay finite and convertible to pixels
+MAX_RADIUS = 1000.0
+
+def zenith_radius(zenith_distance, projection):
+    """Chart radius for zenith distances in radians; the horizon maps to 1."""
+    if projection == 'stereographic':
+        # Conformal: constellation shapes are preserved everywhere
+        return np.minimum(np.tan(zenith_distance / 2.0), MAX_RADIUS)
+    if projection == 'azimuthal_equidistant':
+        # Altitude scales linearly with distance from the centre
+        return zenith_distance / (np.pi / 2.0)
+    if projection == 'orthographic':
+        # The sky dome seen from outside; only the upper hemisphere exists
+        with np.errstate(invalid='ignore'):
+            return np.where(zenith_distance <= np.pi / 2.0, np.sin(zenith_distance), np.nan)
+    raise ValueError(f"Unknown projection {projection!r}; expected one of {PROJECTIONS}")
+
+def project(az, alt, projection='stereographic'):
+    """Project alt/az in degrees onto a zenith-centred sky chart.
+
+    The chart is drawn as seen looking up: north at the top and east on
+    the left. Returns (x, y) arrays in units of the horizon radius, with y
+    growing downwards like screen coordinates. Points a projection cannot
+    show (below the horizon in orthographic) are NaN.
+    """
+    az = np.radians(az)
+    r = zenith_radius(np.radians(90.0 - np.asarray(alt, dtype=float)), projection)
+    return -r * np.sin(az), -r * np.cos(az)
+
+def horizon_crossing(az0, alt0, az1, alt1):
+    """Where the great-circle arc between two alt/az points meets the horizon.
+
+    Inputs are in degrees and broadcast together; for pairs on opposite sides
+    of the horizon this returns the (az, alt) in degrees of the crossing on
+    the shorter arc. Pairs on the same side give undefined results.
+    """
+    az0, alt0, az1, alt1 = (np.radians(np.asarray(v, dtype=float)) for v in (az0, alt0, az1, alt1))
+    # Horizontal components of the unit vectors; their altitude is sin(alt)
+    h0, h1 = np.cos(alt0), np.cos(alt1)
+    z0, z1 = np.sin(alt0), np.sin(alt1)
+    # Both weights are positive when the points straddle the horizon, so the
+    # weighted sum lies on the shorter arc and has zero altitude
+    with np.errstate(divide='ignore', invalid='ignore'):
+        w0, w1 = -z1 / (z0 - z1), z0 / (z0 - z1)
+    north = w0 * h0 * np.cos(az0) + w1 * h1 * np.cos(az1)
+    east = w0 * h0 * np.sin(az0) + w1 * h1 * np.sin(az1)
+    return np.degrees(np.arctan2(east, north)) % 360.0, np.zeros_like(north)
@@ -0,0 +1,77 @@
+import threading
+
+from astro_logic import ComputationCancelled
+
+class RecomputeWorker:
+    """Runs position computations on a background thread.
+
+    Jobs are callables taking (progress, cancelled) callbacks. Submitting a
+    job while another is pending or running supersedes it: the pending one
+    is dropped and the running one is asked to cancel, so rapid setting
+    changes coalesce into a single computation of the newest request.
+    Finished results are handed over atomically through poll().
+    """
+
+    def __init__(self, name='position-worker'):
+        self.name = name
+        self._condition = threading.Condition()
+        self._thread = None
+        self._pending = None  # (generation, job) waiting to start
+        self._generation = 0  # generation of the newest submitted job
+        self._running = None  # generation of the job currently running
+        self._result = None  # (generation, result, error) not yet polled
+        self.progress = 0.0
+
+    @property
+    def busy(self):
+        """True while a job is queued or running."""
+        with self._condition:
+            return self._pending is not None or self._running is not None
+
+    def submit(self, job):
+        """Queue `job`, superseding any earlier job; returns its generation."""
+        with self._condition:
+            self._generation += 1
+            self._pending = (self._generation, job)
+            self.progress = 0.0
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name=self.name, daemon=True)
+                self._thread.start()
+            self._condition.notify()
+            return self._generation
+
+    def poll(self):
+        """Return (generation, result, error) for a newly finished job, or None."""
+        with self._condition:
+            result, self._result = self._result, None
+            return result
+
+    def _is_superseded(self, generation):
+        return generation != self._generation
+
+    def _run(self):
+        while True:
+            with self._condition:
+                while self._pending is None:
+                    self._condition.wait()
+                generation, job = self._pending
+                self._pending = None
+                self._running = generation
+
+            def progress(fraction, generation=generation):
+                if not self._is_superseded(generation):
+                    self.progress = fraction
+
+            result, error = None, None
+            try:
+                result = job(progress, lambda: self._is_superseded(generation))
+            except ComputationCancelled:
+                pass
+            except Exception as e:
+                error = e
+
+            with self._condition:
+                self._running = None
+                # Only the newest request may publish; anything older is stale
+                if not self._is_superseded(generation):
+                    self._result = (generation, result, error)
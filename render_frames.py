@@ -0,0 +1,165 @@
+"""Render sky charts to PNG files without opening a window.
+
+Frames cover every combination of the requested sites and times and are
+spread over a process pool. The catalog is compiled once up front; each
+worker then opens the compiled catalog and the ephemeris once and renders
+its share of frames through SkyMap.
+
+Example:
+    python render_frames.py --site Warsaw:52.23:21.01 --site Quito:-0.18:-78.47 \\
+        --start 2026-10-18T18:00 --end 2026-10-19T06:00 --step-minutes 30 \\
+        --output-dir charts
+"""
+import argparse
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timedelta, timezone
+
+# Must be set before pygame is imported anywhere in this process or its workers
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_CATALOG = os.path.join(BASE_DIR, 'data', 'star_catalog.csv')
+OFFSCREEN_MOUSE = (-1000, -1000)  # keeps the hover popup out of rendered frames
+
+_worker = None
+
+def parse_site(text):
+    """Parse NAME:LAT:LON (or LAT:LON) into (name, latitude, longitude)."""
+    parts = text.split(':')
+    if len(parts) == 2:
+        parts = [f"{parts[0]}_{parts[1]}"] + parts
+    if len(parts) != 3:
+        raise argparse.ArgumentTypeError(f"Site must be NAME:LAT:LON, got {text!r}")
+    name, lat, lon = parts
+    try:
+        return name, float(lat), float(lon)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"Invalid coordinates in site {text!r}")
+
+def parse_utc(text):
+    """Parse an ISO 8601 date/time, interpreted as UTC when no zone is given."""
+    try:
+        value = datetime.fromisoformat(text)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"Invalid date/time {text!r}")
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return value
+
+def frame_times(start, end, step_minutes):
+    """Return the times from start to end inclusive, step_minutes apart."""
+    if end is None:
+        return [start]
+    if end < start:
+        raise ValueError("End must not be before start")
+    if step_minutes <= 0:
+        raise ValueError("Step must be positive")
+    times = []
+    current = start
+    while current <= end:
+        times.append(current)
+        current += timedelta(minutes=step_minutes)
+    return times
+
+def _init_worker(catalog_path, zoom):
+    """Load the catalog, ephemeris and an off-screen SkyMap once per process."""
+    global _worker
+    import pygame
+    from astro_logic import get_ephemeris, get_timescale
+    from catalog_cache import open_star_catalog
+    from gui import SkyMap, WIDTH, HEIGHT, catalog_load_options
+
+    pygame.init()
+    sky_map = SkyMap()
+    sky_map.catalog = open_star_catalog(catalog_path, **catalog_load_options())
+    sky_map.ts = get_timescale()
+    sky_map.zoom_factor = zoom
+    get_ephemeris()
+    _worker = {
+        'sky_map': sky_map,
+        'surface': pygame.Surface((WIDTH, HEIGHT)),
+        'observers': {}
+    }
+
+def _render_frame(task):
+    """Render one (site, time) frame to `filename`; returns (filename, error)."""
+    from skyfield.api import Topos
+
+    (name, lat, lon), when, filename = task
+    sky_map = _worker['sky_map']
+    try:
+        # Reuse one observer per site so consecutive times stay incremental;
+        # keyed by coordinates (every site is at sea level), not by name
+        observer = _worker['observers'].get((lat, lon))
+        if observer is None:
+            observer = Topos(latitude_degrees=lat, longitude_degrees=lon)
+            _worker['observers'][(lat, lon)] = observer
+        sky_map.observer = observer
+        sky_map.current_time = sky_map.ts.from_datetime(when)
+        sky_map.current_view = ('Site', f"{name} {when:%Y-%m-%d %H:%M} UTC")
+        if not sky_map.update_star_positions():
+            return filename, "star positions could not be calculated"
+        sky_map.draw(_worker['surface'], OFFSCREEN_MOUSE)
+        if not sky_map.export_view(filename, _worker['surface']):
+            return filename, "export failed"
+        return filename, None
+    except Exception as e:
+        return filename, str(e)
+
+def build_tasks(sites, times, output_dir):
+    """One task per (site, time), grouped by site so workers get runs of one site."""
+    tasks = []
+    for site in sites:
+        for when in times:
+            filename = os.path.join(output_dir, f"{site[0]}_{when:%Y%m%dT%H%M%SZ}.png")
+            tasks.append((site, when, filename))
+    return tasks
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Render sky charts headlessly to PNG files.")
+    parser.add_argument('--site', action='append', type=parse_site, required=True,
+                        help="Observer as NAME:LAT:LON; repeat for several sites")
+    parser.add_argument('--start', type=parse_utc, required=True, help="First frame time (UTC)")
+    parser.add_argument('--end', type=parse_utc, help="Last frame time (UTC); defaults to --start")
+    parser.add_argument('--step-minutes', type=float, default=60.0, help="Time between frames")
+    parser.add_argument('--output-dir', default='frames', help="Directory for the PNG files")
+    parser.add_argument('--catalog', default=DEFAULT_CATALOG, help="Star catalog CSV")
+    parser.add_argument('--zoom', type=float, default=1.0, help="Zoom factor for every frame")
+    parser.add_argument('--workers', type=int, default=os.cpu_count(), help="Worker processes")
+    args = parser.parse_args(argv)
+
+    try:
+        times = frame_times(args.start, args.end, args.step_minutes)
+    except ValueError as e:
+        parser.error(str(e))
+    names = [name for name, _, _ in args.site]
+    if len(set(names)) != len(names):
+        parser.error("Site names must be unique; they name the output files")
+    os.makedirs(args.output_dir, exist_ok=True)
+    # Compile the catalog here, so the workers only open the finished cache
+    # instead of racing each other to build it
+    from catalog_cache import open_star_catalog
+    from gui import catalog_load_options
+    open_star_catalog(args.catalog, **catalog_load_options())
+    tasks = build_tasks(args.site, times, args.output_dir)
+    workers = max(1, min(args.workers or 1, len(tasks)))
+    # Hand each worker contiguous runs of frames for the same site
+    chunksize = max(1, len(tasks) // (workers * 4))
+
+    failures = 0
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                             initargs=(args.catalog, args.zoom)) as pool:
+        for filename, error in pool.map(_render_frame, tasks, chunksize=chunksize):
+            if error:
+                failures += 1
+                print(f"Failed to render {filename}: {error}")
+            else:
+                print(f"Rendered {filename}")
+
+    print(f"Rendered {len(tasks) - failures} of {len(tasks)} frames")
+    return 1 if failures else 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,33 @@
+import pygame
+
+class RenderLayer:
+    """Off-screen surface that is only re-rendered when its inputs change.
+
+    Callers describe everything the layer depends on as a hashable key;
+    get() redraws through the supplied callback only when that key (or
+    the requested size) differs from the one the surface was last drawn for.
+    """
+
+    def __init__(self, transparent=False):
+        self.transparent = transparent
+        self.surface = None
+        self.key = None
+        self.renders = 0
+
+    def invalidate(self):
+        """Force the next get() to re-render."""
+        self.key = None
+
+    def get(self, key, size, render):
+        """Return the layer surface, calling render(surface) if it is stale."""
+        if self.surface is None or self.surface.get_size() != tuple(size):
+            flags = pygame.SRCALPHA if self.transparent else 0
+            self.surface = pygame.Surface(size, flags)
+            self.key = None
+        if self.key is None or key != self.key:
+            if self.transparent:
+                self.surface.fill((0, 0, 0, 0))
+            render(self.surface)
+            self.key = key
+            self.renders += 1
+        return self.surface
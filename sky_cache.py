@@ -0,0 +1,247 @@
+import hashlib
+import json
+import os
+import sys
+import threading
+from collections import OrderedDict
+from datetime import datetime, timezone
+
+import numpy as np
+
+from astro_logic import get_timescale
+from star_field import StarField
+from utils.logger import setup_logger
+
+logger = setup_logger()
+
+# calculate_body_positions arrays kept in a persisted state, under a 'body_' prefix
+BODY_COLUMNS = ('az', 'alt', 'distance_au', 'mag', 'phase_angle', 'phase')
+# Part of every file name, so files in an older layout are never read
+STATE_FORMAT_VERSION = 3
+
+def time_slot(time, resolution):
+    """Index of the `resolution`-second slot a single Time is rounded to."""
+    # UTC rather than TT, so whole-minute civil times fall on slot times
+    return int(round(time.utc_datetime().timestamp() / resolution))
+
+def slot_time(ts, slot, resolution):
+    """Return the UTC time slot `slot` of time_slot() stands for."""
+    return ts.from_datetime(datetime.fromtimestamp(slot * resolution, tz=timezone.utc))
+
+def catalog_fingerprint(catalog):
+    """Return a hex digest identifying the catalog's contents.
+
+    Compiled catalogs reuse the source digest from their manifest, combined
+    with the filters they were loaded with; a DataFrame is hashed row by row.
+    """
+    manifest = getattr(catalog, 'manifest', None)
+    if manifest is not None:
+        filters = json.dumps(manifest.get('filters'), sort_keys=True)
+        return hashlib.sha256((manifest['source_sha256'] + filters).encode('utf-8')).hexdigest()
+
+    import pandas as pd
+
+    hashes = pd.util.hash_pandas_object(catalog[['name', 'ra', 'dec', 'mag']], index=False)
+    return hashlib.sha256(hashes.to_numpy().tobytes()).hexdigest()
+
+def _state_nbytes(stars, bodies):
+    # Name strings are counted too: states read from disk own theirs, and
+    # for computed ones, which share them with the catalog, overcounting
+    # only keeps the cache further under its budget
+    nbytes = stars.names.nbytes + sum(map(sys.getsizeof, stars.names))
+    nbytes += stars.az.nbytes + stars.alt.nbytes + stars.mag.nbytes
+    if stars.bv is not None:
+        nbytes += stars.bv.nbytes
+    if bodies is not None:
+        nbytes += sum(bodies[column].nbytes for column in BODY_COLUMNS)
+    return nbytes
+
+class SkyStateCache:
+    """LRU cache of computed (stars, bodies, time) states for one catalog.
+
+    States are keyed by the observer's latitude, longitude and elevation
+    and the UTC time rounded to `time_resolution` seconds, so every time
+    within a slot shares one result. The slot is only the key: a state is
+    computed at the time first requested and stored with that exact time,
+    which callers report alongside the positions. Callers that want slot
+    boundaries snap their times with quantize() first. The least recently
+    used states are evicted once their arrays exceed `max_bytes`.
+
+    With a `cache_dir`, states are also written there as .npz files, tagged
+    with the catalog fingerprint, and read back on a memory miss, so they
+    survive restarts. Disk access only happens in load() and store(), which
+    are meant for the worker thread; get() never touches the disk and does
+    not count misses. At most `max_disk_entries` files are kept.
+    """
+
+    def __init__(self, catalog, time_resolution=60.0, max_bytes=256 * 1024 * 1024,
+                 cache_dir=None, max_disk_entries=64):
+        self.catalog = catalog
+        self.time_resolution = time_resolution
+        self.max_bytes = max_bytes
+        self.cache_dir = cache_dir
+        self.max_disk_entries = max_disk_entries
+        self._fingerprint = None
+        self._states = OrderedDict()  # key -> (stars, bodies, time, nbytes)
+        self._lock = threading.Lock()
+        self.nbytes = 0
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @property
+    def fingerprint(self):
+        """Catalog digest, computed on first use since hashing a DataFrame is not free."""
+        if self._fingerprint is None:
+            self._fingerprint = catalog_fingerprint(self.catalog)
+        return self._fingerprint
+
+    def key(self, observer, time):
+        """Cache key for an observer and a single time."""
+        return (
+            round(observer.latitude.degrees, 6),
+            round(observer.longitude.degrees, 6),
+            round(observer.elevation.m, 1),
+            time_slot(time, self.time_resolution)
+        )
+
+    def quantize(self, time):
+        """Return the time of the slot `time` is rounded to."""
+        return slot_time(time.ts, time_slot(time, self.time_resolution), self.time_resolution)
+
+    def get(self, key):
+        """Return the (stars, bodies, time) state for `key` from memory, or None."""
+        with self._lock:
+            entry = self._states.get(key)
+            if entry is None:
+                return None
+            self._states.move_to_end(key)
+            self.hits += 1
+            return entry[:3]
+
+    def load(self, key):
+        """Like get(), but falls back to the disk cache; counts a miss when
+        neither has the state."""
+        state = self.get(key)
+        if state is not None:
+            return state
+        state = self._read(key)
+        if state is None:
+            with self._lock:
+                self.misses += 1
+            return None
+        with self._lock:
+            self.disk_hits += 1
+        self._insert(key, *state)
+        return state
+
+    def store(self, key, stars, bodies, time):
+        """Add a state computed at `time`, writing it to disk when persistence is on."""
+        self._insert(key, stars, bodies, time)
+        try:
+            self._write(key, stars, bodies, time)
+        except OSError as e:
+            logger.warning(f"Could not persist sky state: {e}")
+
+    def _insert(self, key, stars, bodies, time):
+        nbytes = _state_nbytes(stars, bodies)
+        with self._lock:
+            previous = self._states.pop(key, None)
+            if previous is not None:
+                self.nbytes -= previous[3]
+            self._states[key] = (stars, bodies, time, nbytes)
+            self.nbytes += nbytes
+            # Always keep the newest state, even if it alone exceeds the budget
+            while self.nbytes > self.max_bytes and len(self._states) > 1:
+                _, (_, _, _, evicted) = self._states.popitem(last=False)
+                self.nbytes -= evicted
+                self.evictions += 1
+
+    def _path(self, key):
+        digest = hashlib.sha1(repr(
+            (STATE_FORMAT_VERSION, self.fingerprint, self.time_resolution, key)).encode('utf-8'))
+        return os.path.join(self.cache_dir, digest.hexdigest() + '.npz')
+
+    def _read(self, key):
+        if self.cache_dir is None:
+            return None
+        path = self._path(key)
+        try:
+            with np.load(path, allow_pickle=False) as data:
+                stars = StarField(data['names'].astype(object), data['az'], data['alt'], data['mag'],
+                                  data['bv'] if 'bv' in data else None)
+                stars.sorted_by_mag = bool(data['sorted_by_mag'])
+                bodies = None
+                if 'body_names' in data:
+                    bodies = {'name': [str(name) for name in data['body_names']]}
+                    for column in BODY_COLUMNS:
+                        bodies[column] = data['body_' + column]
+                time = get_timescale().tt_jd(float(data['time_tt']))
+        except (OSError, KeyError, ValueError):
+            # Missing, truncated or from an older layout: recompute instead
+            return None
+        try:
+            os.utime(path)  # pruning removes the least recently used files
+        except OSError:
+            pass
+        return stars, bodies, time
+
+    def _write(self, key, stars, bodies, time):
+        if self.cache_dir is None:
+            return
+        os.makedirs(self.cache_dir, exist_ok=True)
+        arrays = {
+            'names': stars.names.astype(str),
+            'az': stars.az,
+            'alt': stars.alt,
+            'mag': stars.mag,
+            'sorted_by_mag': np.array(stars.sorted_by_mag),
+            'time_tt': np.array(time.tt)
+        }
+        if stars.bv is not None:
+            arrays['bv'] = stars.bv
+        if bodies is not None:
+            arrays['body_names'] = np.array(bodies['name'])
+            for column in BODY_COLUMNS:
+                arrays['body_' + column] = bodies[column]
+
+        path = self._path(key)
+        tmp_path = path + '.tmp'
+        with open(tmp_path, 'wb') as f:
+            np.savez(f, **arrays)
+        os.replace(tmp_path, path)
+        self._prune_disk()
+
+    def _prune_disk(self):
+        """Delete the oldest state files beyond max_disk_entries."""
+        paths = [os.path.join(self.cache_dir, name) for name in os.listdir(self.cache_dir)
+                 if name.endswith('.npz')]
+        if len(paths) <= self.max_disk_entries:
+            return
+        paths.sort(key=os.path.getmtime)
+        for path in paths[:len(paths) - self.max_disk_entries]:
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+    def clear(self):
+        """Drop every in-memory state; files on disk are kept."""
+        with self._lock:
+            self._states.clear()
+            self.nbytes = 0
+
+    def stats(self):
+        """Return hit/miss counters, the current size and the hit rate."""
+        with self._lock:
+            lookups = self.hits + self.disk_hits + self.misses
+            return {
+                'entries': len(self._states),
+                'bytes': self.nbytes,
+                'hits': self.hits,
+                'disk_hits': self.disk_hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'hit_rate': (self.hits + self.disk_hits) / lookups if lookups else 0.0
+            }
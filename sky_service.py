@@ -0,0 +1,354 @@
+"""Serve star positions, visible-object lists and PNG charts over local HTTP.
+
+One warm process loads the catalog and ephemeris once and answers GET
+requests with JSON or PNG:
+
+    /positions?lat=52.23&lon=21.01&time=2026-10-18T20:00&max_mag=6
+    /visible?lat=52.23&lon=21.01&min_alt=10&max_mag=4
+    /chart.png?lat=52.23&lon=21.01
+    /health
+
+`time` is ISO 8601, taken as UTC when no zone is given, and defaults to
+now. Times are rounded to the sky cache resolution, and responses are
+cached per rounded query, so repeated queries are answered straight from
+the event loop. Computation and rendering run on one worker thread
+driving an off-screen SkyMap; identical queries arriving while one is
+being computed wait for that computation instead of starting another.
+
+Example:
+    python sky_service.py --port 8765
+    curl 'http://127.0.0.1:8765/visible?lat=52.23&lon=21.01'
+"""
+import argparse
+import asyncio
+import io
+import json
+import math
+import os
+import sys
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from urllib.parse import urlsplit, parse_qsl
+
+# Must be set before pygame is imported anywhere in this process
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+
+from sky_cache import slot_time, time_slot
+from utils.logger import setup_logger
+
+logger = setup_logger()
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_CATALOG = os.path.join(BASE_DIR, 'data', 'star_catalog.csv')
+OFFSCREEN_MOUSE = (-1000, -1000)  # keeps the hover popup out of rendered charts
+KEEP_ALIVE_SECONDS = 15
+MAX_HEADER_LINES = 100
+
+REASONS = {
+    200: 'OK', 400: 'Bad Request', 404: 'Not Found',
+    405: 'Method Not Allowed', 500: 'Internal Server Error'
+}
+
+class RequestError(Exception):
+    """A request that cannot be answered; carries the HTTP status."""
+
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+def _float_param(params, name, default=None, low=None, high=None):
+    value = params.get(name)
+    if value is None:
+        if default is None:
+            raise RequestError(400, f"Missing parameter {name!r}")
+        return default
+    try:
+        value = float(value)
+    except ValueError:
+        raise RequestError(400, f"Parameter {name!r} must be a number")
+    if not math.isfinite(value):
+        raise RequestError(400, f"Parameter {name!r} must be a finite number")
+    if (low is not None and value < low) or (high is not None and value > high):
+        raise RequestError(400, f"Parameter {name!r} must be between {low} and {high}")
+    return value
+
+def _time_param(params):
+    text = params.get('time')
+    if text is None:
+        return datetime.now(timezone.utc)
+    try:
+        value = datetime.fromisoformat(text)
+    except ValueError:
+        raise RequestError(400, f"Invalid time {text!r}")
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return value
+
+class SkyService:
+    """Answers sky queries from one off-screen SkyMap, with a response cache."""
+
+    def __init__(self, catalog, zoom=1.0, cache_entries=256):
+        import pygame
+        from astro_logic import get_ephemeris, get_timescale
+        from gui import SkyMap, WIDTH, HEIGHT
+
+        pygame.init()
+        self.sky_map = SkyMap()
+        self.sky_map.catalog = catalog
+        self.sky_map.ts = get_timescale()
+        self.sky_map.zoom_factor = zoom
+        get_ephemeris()
+        self.surface = pygame.Surface((WIDTH, HEIGHT))
+        self.time_resolution = self.sky_map.sky_cache_config['time_resolution_seconds']
+
+        self.cache_entries = cache_entries
+        self._responses = OrderedDict()  # key -> (content type, body)
+        self._in_flight = {}  # key -> Future of (content type, body)
+        self._observers = {}
+        # SkyMap is not thread-safe, so all of its work runs on this one thread
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='sky-service')
+        self.hits = 0
+        self.misses = 0
+
+    def _observer(self, lat, lon):
+        """One Topos per site, so repeated sites keep the incremental engine warm."""
+        from skyfield.api import Topos
+
+        observer = self._observers.get((lat, lon))
+        if observer is None:
+            if len(self._observers) > 1024:
+                self._observers.clear()
+            observer = Topos(latitude_degrees=lat, longitude_degrees=lon)
+            self._observers[(lat, lon)] = observer
+        return observer
+
+    def _update(self, lat, lon, time):
+        """Point the SkyMap at a site and time and compute its positions.
+
+        Returns the UTC datetime the positions were actually computed for.
+        """
+        sky_map = self.sky_map
+        sky_map.observer = self._observer(lat, lon)
+        sky_map.current_time = time
+        if not sky_map.update_star_positions():
+            raise RequestError(500, "Star positions could not be calculated")
+        return sky_map.positions_time.utc_datetime()
+
+    def _positions(self, lat, lon, time, max_mag):
+        when = self._update(lat, lon, time)
+        stars = self.sky_map.star_positions
+        if max_mag is not None:
+            stars = stars.brighter_than(max_mag)
+        return 'application/json', self._json({
+            'latitude': lat,
+            'longitude': lon,
+            'time': when.isoformat(),
+            'stars': {
+                'name': [str(name) for name in stars.names],
+                'az': stars.az.round(6).tolist(),
+                'alt': stars.alt.round(6).tolist(),
+                'mag': [None if mag != mag else mag for mag in stars.mag.tolist()]
+            },
+            'bodies': self._body_records()
+        })
+
+    def _visible(self, lat, lon, time, min_alt, max_mag):
+        when = self._update(lat, lon, time)
+        stars = self.sky_map.star_positions.brighter_than(max_mag)
+        stars = stars[stars.alt >= min_alt]
+        objects = [dict(stars.record(i), type='Star', name=str(stars.names[i]))
+                   for i in range(len(stars))]
+        for record in self._body_records():
+            if record['alt'] >= min_alt and record['mag'] is not None and record['mag'] <= max_mag:
+                record['type'] = record.pop('kind')
+                objects.append(record)
+        objects.sort(key=lambda record: record['mag'])
+        return 'application/json', self._json({
+            'latitude': lat,
+            'longitude': lon,
+            'time': when.isoformat(),
+            'min_alt': min_alt,
+            'max_mag': max_mag,
+            'objects': objects
+        })
+
+    def _chart(self, lat, lon, time):
+        import pygame
+
+        when = self._update(lat, lon, time)
+        sky_map = self.sky_map
+        sky_map.current_view = ('Site', f"{lat:.2f}, {lon:.2f} {when:%Y-%m-%d %H:%M} UTC")
+        sky_map.draw(self.surface, OFFSCREEN_MOUSE)
+        buffer = io.BytesIO()
+        pygame.image.save(self.surface, buffer, 'png')
+        return 'image/png', buffer.getvalue()
+
+    def _body_records(self):
+        from solar_system import body_record
+
+        bodies = self.sky_map.bodies
+        if bodies is None:
+            return []
+        records = [body_record(bodies, i) for i in range(len(bodies['name']))]
+        # NaN is not valid JSON; e.g. planetary_magnitude() has no value for some phases
+        for record in records:
+            for field, value in record.items():
+                if value != value:
+                    record[field] = None
+        return records
+
+    @staticmethod
+    def _json(payload):
+        return json.dumps(payload, allow_nan=False).encode('utf-8')
+
+    def _route(self, path, params):
+        """Return (cache key, job) for a request; the job returns (content type, body)."""
+        if path == '/health':
+            return None, lambda: ('application/json', self._json(self.stats()))
+
+        handlers = {'/positions', '/visible', '/chart.png'}
+        if path not in handlers:
+            raise RequestError(404, f"Unknown path {path!r}")
+
+        lat = _float_param(params, 'lat', low=-90.0, high=90.0)
+        lon = _float_param(params, 'lon', low=-180.0, high=180.0)
+        time = self.sky_map.ts.from_datetime(_time_param(params))
+        # Snap to the sky cache slot so 'now' and nearby times share a response,
+        # and the positions are computed at exactly the reported time
+        slot = time_slot(time, self.time_resolution)
+        time = slot_time(time.ts, slot, self.time_resolution)
+        site = (round(lat, 6), round(lon, 6), slot)
+
+        if path == '/positions':
+            max_mag = params.get('max_mag')
+            max_mag = None if max_mag is None else _float_param(params, 'max_mag')
+            return (path, site, max_mag), lambda: self._positions(lat, lon, time, max_mag)
+        if path == '/visible':
+            min_alt = _float_param(params, 'min_alt', 0.0, -90.0, 90.0)
+            max_mag = _float_param(params, 'max_mag', 6.5)
+            return (path, site, min_alt, max_mag), lambda: self._visible(lat, lon, time, min_alt, max_mag)
+        return (path, site), lambda: self._chart(lat, lon, time)
+
+    async def respond(self, path, params):
+        """Return (content type, body) for a GET request, from the cache when possible."""
+        key, job = self._route(path, params)
+        loop = asyncio.get_running_loop()
+        if key is None:
+            return job()
+
+        cached = self._responses.get(key)
+        if cached is not None:
+            self._responses.move_to_end(key)
+            self.hits += 1
+            return cached
+
+        future = self._in_flight.get(key)
+        if future is None:
+            self.misses += 1
+            future = loop.run_in_executor(self._executor, job)
+            self._in_flight[key] = future
+            try:
+                # Shielded so a client hanging up does not cancel the work for others
+                response = await asyncio.shield(future)
+            finally:
+                del self._in_flight[key]
+            self._responses[key] = response
+            if len(self._responses) > self.cache_entries:
+                self._responses.popitem(last=False)
+            return response
+        self.hits += 1
+        return await asyncio.shield(future)
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            'status': 'ok',
+            'stars': len(self.sky_map.catalog),
+            'cached_responses': len(self._responses),
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': self.hits / lookups if lookups else 0.0
+        }
+
+    async def handle_connection(self, reader, writer):
+        """Serve HTTP/1.1 requests on one connection until it is closed."""
+        try:
+            while True:
+                try:
+                    request_line = await asyncio.wait_for(reader.readline(), KEEP_ALIVE_SECONDS)
+                except asyncio.TimeoutError:
+                    break
+                if not request_line:
+                    break
+                headers = {}
+                for _ in range(MAX_HEADER_LINES):
+                    line = await reader.readline()
+                    if line in (b'\r\n', b'\n', b''):
+                        break
+                    name, _, value = line.decode('latin-1').partition(':')
+                    headers[name.strip().lower()] = value.strip()
+
+                keep_alive = headers.get('connection', '').lower() != 'close'
+                status, content_type, body = await self._dispatch(request_line)
+                writer.write(
+                    f"HTTP/1.1 {status} {REASONS[status]}\r\n"
+                    f"Content-Type: {content_type}\r\n"
+                    f"Content-Length: {len(body)}\r\n"
+                    f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n"
+                    .encode('latin-1') + body
+                )
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    async def _dispatch(self, request_line):
+        try:
+            method, target, _ = request_line.decode('latin-1').split(' ', 2)
+        except ValueError:
+            return 400, 'text/plain', b'Malformed request line'
+        if method != 'GET':
+            return 405, 'text/plain', b'Only GET is supported'
+
+        url = urlsplit(target)
+        try:
+            content_type, body = await self.respond(url.path, dict(parse_qsl(url.query)))
+            return 200, content_type, body
+        except RequestError as e:
+            return e.status, 'application/json', self._json({'error': str(e)})
+        except Exception as e:
+            logger.error(f"Sky service request {target} failed: {e}")
+            return 500, 'application/json', self._json({'error': str(e)})
+
+async def serve(service, host, port):
+    server = await asyncio.start_server(service.handle_connection, host, port)
+    print(f"Serving on http://{host}:{port}")
+    async with server:
+        await server.serve_forever()
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Serve sky positions and charts over local HTTP.")
+    parser.add_argument('--host', default='127.0.0.1', help="Address to listen on")
+    parser.add_argument('--port', type=int, default=8765, help="Port to listen on")
+    parser.add_argument('--catalog', default=DEFAULT_CATALOG, help="Star catalog CSV")
+    parser.add_argument('--zoom', type=float, default=1.0, help="Zoom factor for rendered charts")
+    parser.add_argument('--cache-entries', type=int, default=256, help="Cached responses to keep")
+    args = parser.parse_args(argv)
+
+    from catalog_cache import open_star_catalog
+    from gui import catalog_load_options
+
+    catalog = open_star_catalog(args.catalog, **catalog_load_options())
+    service = SkyService(catalog, args.zoom, args.cache_entries)
+    try:
+        asyncio.run(serve(service, args.host, args.port))
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
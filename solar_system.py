@@ -0,0 +1,149 @@
+from collections import OrderedDict
+
+import numpy as np
+
+from astro_logic import get_ephemeris, get_earth
+
+# Display name and ephemeris target of every body the engine tracks. The
+# outer planets are only available as system barycenters in DE421, which is
+# well within a pixel of the planet itself.
+BODIES = (
+    ('Sun', 'sun'),
+    ('Moon', 'moon'),
+    ('Mercury', 'mercury'),
+    ('Venus', 'venus'),
+    ('Mars', 'mars barycenter'),
+    ('Jupiter', 'jupiter barycenter'),
+    ('Saturn', 'saturn barycenter'),
+    ('Uranus', 'uranus barycenter'),
+    ('Neptune', 'neptune barycenter')
+)
+SUN_MAGNITUDE = -26.74
+
+def _moon_magnitude(phase_angle_deg):
+    """Apparent magnitude of the Moon from its phase angle (Allen's formula)."""
+    a = np.abs(phase_angle_deg)
+    return -12.73 + 0.026 * a + 4e-9 * a ** 4
+
+def _angle_between(u, v):
+    """Angle in degrees between vectors stacked along axis 1."""
+    cos = np.sum(u * v, axis=1) / (np.linalg.norm(u, axis=1) * np.linalg.norm(v, axis=1))
+    return np.degrees(np.arccos(np.clip(cos, -1.0, 1.0)))
+
+def calculate_body_positions(observer, time):
+    """Alt/az, apparent magnitude and phase of the Sun, Moon and planets.
+
+    `time` may be a single Skyfield Time or an array of times. Returns a
+    dict with a 'name' list in BODIES order and arrays of shape (n_bodies,)
+    for a single time or (n_bodies, n_times) otherwise: 'az', 'alt' and
+    'distance_au', 'mag', 'phase_angle' in degrees and 'phase', the
+    illuminated fraction of the disc.
+    """
+    from skyfield.magnitudelib import planetary_magnitude
+
+    ephemeris = get_ephemeris()
+    site = (get_earth() + observer).at(time)
+    sun = ephemeris['sun'].at(time).position.au
+
+    az, alt, distance, mag, astrometric = [], [], [], [], []
+    for name, target in BODIES:
+        observation = site.observe(ephemeris[target])
+        body_alt, body_az, body_distance = observation.apparent().altaz()
+        az.append(body_az.degrees)
+        alt.append(body_alt.degrees)
+        distance.append(body_distance.au)
+        astrometric.append(observation.position.au)
+        if name == 'Sun':
+            mag.append(np.full_like(body_az.degrees, SUN_MAGNITUDE))
+        elif name == 'Moon':
+            mag.append(None)  # filled in from the phase angle below
+        else:
+            mag.append(planetary_magnitude(observation))
+
+    # Phase angle is Sun-body-observer, seen from the body; done for all
+    # bodies at once on the stacked (n_bodies, 3, ...) vectors
+    astrometric = np.array(astrometric)
+    to_observer = -astrometric
+    to_sun = sun[np.newaxis] - (site.position.au[np.newaxis] + astrometric)
+    phase_angle = _angle_between(to_observer, to_sun)
+    phase_angle[0] = 0.0  # the Sun is its own light source
+    phase = (1.0 + np.cos(np.radians(phase_angle))) / 2.0
+
+    moon = [name for name, _ in BODIES].index('Moon')
+    mag[moon] = _moon_magnitude(phase_angle[moon])
+
+    return {
+        'name': [name for name, _ in BODIES],
+        'az': np.array(az),
+        'alt': np.array(alt),
+        'distance_au': np.array(distance),
+        'mag': np.array(mag, dtype=float),
+        'phase_angle': phase_angle,
+        'phase': phase
+    }
+
+def body_record(result, i):
+    """Return body `i` of a calculate_body_positions result as a popup dict."""
+    name = result['name'][i]
+    return {
+        'kind': name if name in ('Sun', 'Moon') else 'Planet',
+        'name': name,
+        'az': float(result['az'][i]),
+        'alt': float(result['alt'][i]),
+        'mag': float(result['mag'][i]),
+        'phase': float(result['phase'][i]),
+        'distance_au': float(result['distance_au'][i])
+    }
+
+class SolarSystem:
+    """Body positions cached per (observer, epoch).
+
+    The bodies move slowly against the frame rate, so one computation per
+    time step serves every frame drawn for it. Observers are keyed by their
+    coordinates, so recreating an identical Topos still hits the cache.
+    """
+
+    def __init__(self, max_entries=64):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def _key(observer, time):
+        return (
+            observer.latitude.degrees,
+            observer.longitude.degrees,
+            observer.elevation.m,
+            float(time.tt)
+        )
+
+    def positions_at(self, observer, time):
+        """Return calculate_body_positions(observer, time) for a single time,
+        computing it only on a cache miss."""
+        key = self._key(observer, time)
+        result = self._entries.get(key)
+        if result is not None:
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return result
+
+        self.misses += 1
+        result = calculate_body_positions(observer, time)
+        self._entries[key] = result
+        if len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+        return result
+
+    def clear(self):
+        self._entries.clear()
+
+    def stats(self):
+        """Return hit/miss counters and the current size."""
+        lookups = self.hits + self.misses
+        return {
+            'entries': len(self._entries),
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': self.hits / lookups if lookups else 0.0
+        }
@@ -0,0 +1,66 @@
+import numpy as np
+
+# Cell coordinates are clamped to this range before being packed into a
+# single int64 key; stars projected further away than that share the edge
+# cells, which stays correct because candidates are distance-checked.
+_CELL_LIMIT = 1 << 20
+
+class ScreenGrid:
+    """Uniform grid over projected star screen positions for hover hit-testing.
+
+    Stars are bucketed by screen cell once, when the view changes; a lookup
+    then only inspects the handful of cells around the cursor, so its cost
+    does not grow with the catalog size.
+    """
+
+    def __init__(self, xs, ys, cell_size=32):
+        self.xs = np.asarray(xs, dtype=float)
+        self.ys = np.asarray(ys, dtype=float)
+        self.cell_size = cell_size
+
+        keys = self._keys(self._cells(self.xs), self._cells(self.ys))
+        self._order = np.argsort(keys, kind='stable')
+        self._sorted_keys = keys[self._order]
+
+    def __len__(self):
+        return len(self.xs)
+
+    def _cells(self, values):
+        cells = np.floor_divide(values, self.cell_size)
+        return np.clip(np.nan_to_num(cells), -_CELL_LIMIT, _CELL_LIMIT - 1).astype(np.int64)
+
+    @staticmethod
+    def _keys(cx, cy):
+        return ((cx + _CELL_LIMIT) << 21) | (cy + _CELL_LIMIT)
+
+    def _candidates(self, x, y, radius):
+        """Indices of stars in every cell the search circle can touch."""
+        x_cells = self._cells(np.array([x - radius, x + radius]))
+        y_cells = self._cells(np.array([y - radius, y + radius]))
+        found = []
+        for cx in range(x_cells[0], x_cells[1] + 1):
+            cy_range = np.arange(y_cells[0], y_cells[1] + 1, dtype=np.int64)
+            keys = self._keys(np.int64(cx), cy_range)
+            starts = np.searchsorted(self._sorted_keys, keys, side='left')
+            ends = np.searchsorted(self._sorted_keys, keys, side='right')
+            for start, end in zip(starts, ends):
+                if end > start:
+                    found.append(self._order[start:end])
+        if not found:
+            return np.empty(0, dtype=np.intp)
+        return np.concatenate(found)
+
+    def nearest(self, x, y, radius):
+        """Return the index of the closest star within `radius` pixels, or None.
+
+        Ties go to the higher index, i.e. the star drawn last and so on top.
+        """
+        candidates = self._candidates(x, y, radius)
+        if not len(candidates):
+            return None
+        distances = np.hypot(self.xs[candidates] - x, self.ys[candidates] - y)
+        inside = distances < radius
+        if not inside.any():
+            return None
+        candidates, distances = candidates[inside], distances[inside]
+        return int(candidates[np.lexsort((-candidates, distances))[0]])
@@ -0,0 +1,109 @@
+import numpy as np
+
+from astro_logic import geocentric_itrs_vectors
+
+# Altitude of a star's centre at apparent rise and set, allowing for
+# standard atmospheric refraction at the horizon
+STANDARD_HORIZON_DEG = -0.5667
+# Hour angle advances by one turn per sidereal day
+SIDEREAL_RATE = 2 * np.pi * 1.00273781191135448  # radians per day
+
+def _half_arc(lat, dec, altitude_deg):
+    """Hour angle in radians at which stars reach `altitude_deg`, or NaN.
+
+    Also returns masks of stars that stay above (always) or below (never)
+    that altitude all day.
+    """
+    cos_h = ((np.sin(np.radians(altitude_deg)) - np.sin(lat) * np.sin(dec))
+             / (np.cos(lat) * np.cos(dec)))
+    always = cos_h <= -1.0
+    never = cos_h >= 1.0
+    with np.errstate(invalid='ignore'):
+        half_arc = np.where(always | never, np.nan, np.arccos(np.clip(cos_h, -1.0, 1.0)))
+    return half_arc, always, never
+
+def _time_until(hour_angle, target):
+    """Days until the hour angle next reaches `target` (radians, broadcast)."""
+    return ((target - hour_angle) % (2 * np.pi)) / SIDEREAL_RATE
+
+def _altitude(lat, dec, hour_angle):
+    sin_alt = np.sin(lat) * np.sin(dec) + np.cos(lat) * np.cos(dec) * np.cos(hour_angle)
+    return np.degrees(np.arcsin(np.clip(sin_alt, -1.0, 1.0)))
+
+def calculate_star_events(catalog, observer, start, end, horizon=STANDARD_HORIZON_DEG):
+    """Rise, transit and set times for the whole catalog between two times.
+
+    A fixed star's altitude depends only on its hour angle, which grows at
+    the sidereal rate, so every event follows in closed form from the
+    apparent places at `start` without any root finding. Over a night the
+    places barely move, so the times are good to a few seconds.
+
+    Returns a dict of columns, one entry per catalog row that could be
+    computed: 'name', 'mag', 'dec' (degrees); 'rise', 'transit' and 'set',
+    the first such event after `start` as a TT Julian date, NaN when none
+    happens before `end` (convert with ``ts.tt_jd()``); 'transit_alt';
+    'max_alt', the highest altitude reached between start and end;
+    'circumpolar' and 'never_rises' masks relative to `horizon`; and
+    'failed' as in calculate_star_arrays.
+    """
+    result = geocentric_itrs_vectors(catalog, start)
+    x, y, z = result['vectors']
+    lat = np.radians(observer.latitude.degrees)
+    lon = np.radians(observer.longitude.degrees)
+
+    dec = np.arcsin(np.clip(z, -1.0, 1.0))
+    # In the Earth-fixed frame a star's longitude is minus its Greenwich
+    # hour angle, so the local hour angle is the observer's longitude minus it
+    hour_angle = (lon - np.arctan2(y, x)) % (2 * np.pi)
+    duration = end.tt - start.tt
+
+    half_arc, circumpolar, never_rises = _half_arc(lat, dec, horizon)
+
+    def within_window(days):
+        return np.where(days <= duration, start.tt + days, np.nan)
+
+    transit_in = _time_until(hour_angle, 0.0)
+    rise = within_window(_time_until(hour_angle, -half_arc))
+    set_ = within_window(_time_until(hour_angle, half_arc))
+    transit = within_window(transit_in)
+
+    # The altitude peaks at transit, otherwise at one end of the window
+    transit_alt = _altitude(lat, dec, 0.0)
+    end_alt = _altitude(lat, dec, hour_angle + SIDEREAL_RATE * duration)
+    max_alt = np.where(
+        transit_in <= duration,
+        transit_alt,
+        np.maximum(_altitude(lat, dec, hour_angle), end_alt)
+    )
+
+    return {
+        'name': result['name'],
+        'mag': result['mag'],
+        'dec': np.degrees(dec),
+        'rise': rise,
+        'transit': transit,
+        'set': set_,
+        'transit_alt': transit_alt,
+        'max_alt': max_alt,
+        'circumpolar': circumpolar,
+        'never_rises': never_rises,
+        'failed': result['failed'],
+    }
+
+def select_events(events, min_altitude=None, max_magnitude=None):
+    """Filter calculate_star_events columns to the stars worth listing.
+
+    `min_altitude` keeps stars that climb at least that high during the
+    window, so ``select_events(events, 20, 4.0)`` lists the naked-eye stars
+    visible at 20 degrees or more tonight. Stars without a magnitude are
+    dropped when `max_magnitude` is given.
+    """
+    keep = np.ones(len(events['name']), dtype=bool)
+    if min_altitude is not None:
+        keep &= events['max_alt'] >= min_altitude
+    if max_magnitude is not None:
+        keep &= events['mag'] <= max_magnitude
+    return {
+        key: (value[keep] if isinstance(value, np.ndarray) else value)
+        for key, value in events.items()
+    }
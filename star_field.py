@@ -0,0 +1,94 @@
+import numpy as np
+
+class StarField:
+    """Computed star positions stored as parallel NumPy arrays.
+
+    Replaces the old list of per-star dicts. Indexing with an integer
+    returns a single star as a dict (name, az, alt, mag); indexing with a
+    slice, an index array or a boolean mask returns a new StarField.
+    `bv` holds B-V colour indices when the catalog provides them, else None.
+    """
+
+    def __init__(self, names, az, alt, mag, bv=None):
+        self.names = np.asarray(names, dtype=object)
+        self.az = np.asarray(az, dtype=float)
+        self.alt = np.asarray(alt, dtype=float)
+        self.mag = np.asarray(mag, dtype=float)
+        self.bv = None if bv is None else np.asarray(bv, dtype=float)
+        if not (len(self.names) == len(self.az) == len(self.alt) == len(self.mag)):
+            raise ValueError("StarField columns must all have the same length")
+        if self.bv is not None and len(self.bv) != len(self.names):
+            raise ValueError("StarField columns must all have the same length")
+        self._index = None
+        self.sorted_by_mag = False
+
+    @classmethod
+    def empty(cls):
+        """Return a StarField containing no stars."""
+        return cls([], [], [], [])
+
+    @classmethod
+    def from_arrays(cls, result):
+        """Build a StarField from the dict returned by calculate_star_arrays."""
+        return cls(result['name'], result['az'], result['alt'], result['mag'], result.get('bv'))
+
+    def __len__(self):
+        return len(self.names)
+
+    def __iter__(self):
+        for i in range(len(self)):
+            yield self.record(i)
+
+    def __getitem__(self, key):
+        if isinstance(key, (int, np.integer)):
+            return self.record(key)
+        bv = None if self.bv is None else self.bv[key]
+        field = StarField(self.names[key], self.az[key], self.alt[key], self.mag[key], bv)
+        # Any slice of a sorted field is still sorted
+        field.sorted_by_mag = self.sorted_by_mag and isinstance(key, slice) and key.step in (None, 1)
+        return field
+
+    def sort_by_magnitude(self):
+        """Return a copy ordered brightest first, with unknown magnitudes last."""
+        order = np.argsort(self.mag, kind='stable')  # NaN sorts last
+        field = self[order]
+        field.sorted_by_mag = True
+        return field
+
+    def brighter_than(self, limit, budget=None):
+        """Return the stars with mag <= limit, capped at the `budget` brightest.
+
+        On a magnitude-sorted field this is a prefix view found by binary
+        search, so no per-star work is done.
+        """
+        if not self.sorted_by_mag:
+            return self.sort_by_magnitude().brighter_than(limit, budget)
+        count = int(np.searchsorted(self.mag, limit, side='right'))
+        if budget is not None:
+            count = min(count, budget)
+        return self[:count]
+
+    @property
+    def index(self):
+        """Mapping of star name to its position in the arrays."""
+        if self._index is None:
+            self._index = {name: i for i, name in enumerate(self.names)}
+        return self._index
+
+    def index_of(self, name):
+        """Return the array index of a star by name, or None if absent."""
+        return self.index.get(name)
+
+    def indices_of(self, names):
+        """Return array indices for the given names, skipping unknown ones."""
+        index = self.index
+        return np.array([index[name] for name in names if name in index], dtype=int)
+
+    def record(self, i):
+        """Return star `i` as a dict with name, az, alt and mag."""
+        return {
+            'name': self.names[i],
+            'az': float(self.az[i]),
+            'alt': float(self.alt[i]),
+            'mag': float(self.mag[i]),
+        }
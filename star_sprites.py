@@ -0,0 +1,117 @@
+import numpy as np
+import pygame
+
+# Star disc radius in pixels at scale 1, from the old max(3, 10 - mag) rule
+MIN_RADIUS = 3.0
+MAX_RADIUS = 10.0
+UNKNOWN_MAGNITUDE = 7.0  # drawn at the smallest size
+# Fainter stars get a plain anti-aliased disc: a halo would barely show on
+# them but would multiply the pixels blitted for the most numerous stars
+GLOW_MIN_RADIUS = 5.0
+# B-V colour index -> RGB, interpolated between these anchors (blue-white
+# O/B stars through white A and yellow G to orange-red M stars)
+BV_ANCHORS = np.array([-0.4, 0.0, 0.3, 0.6, 0.85, 1.4, 2.0])
+BV_RGB = np.array([
+    (155, 176, 255),
+    (202, 215, 255),
+    (248, 247, 255),
+    (255, 244, 234),
+    (255, 226, 190),
+    (255, 204, 111),
+    (255, 170, 90)
+], dtype=float)
+
+def bv_to_rgb(bv):
+    """RGB colours, as an (n, 3) float array, for B-V colour indices."""
+    bv = np.clip(np.atleast_1d(np.asarray(bv, dtype=float)), BV_ANCHORS[0], BV_ANCHORS[-1])
+    return np.stack([np.interp(bv, BV_ANCHORS, BV_RGB[:, channel]) for channel in range(3)], axis=1)
+
+def star_radius(mag, scale=1.0):
+    """Disc radius in pixels for apparent magnitudes."""
+    mag = np.nan_to_num(np.asarray(mag, dtype=float), nan=UNKNOWN_MAGNITUDE)
+    return np.clip(MAX_RADIUS - mag, MIN_RADIUS, MAX_RADIUS) * scale
+
+def _render_sprite(radius, color, glow):
+    """One anti-aliased star of `radius` pixels, white-hot at the centre."""
+    core = radius * 0.75 if glow else radius
+    falloff = radius * 0.35
+    extent = core + 3 * falloff if glow else radius + 1
+    half = int(np.ceil(extent))
+    size = 2 * half + 1
+
+    offsets = np.arange(size) - half
+    d = np.hypot(offsets[:, np.newaxis], offsets[np.newaxis, :])  # indexed [x, y]
+    alpha = np.clip(core - d + 0.5, 0.0, 1.0)  # coverage of the disc edge
+    if glow:
+        alpha = np.maximum(alpha, 0.6 * np.exp(-np.maximum(d - core, 0.0) / falloff))
+    whiteness = 0.6 * np.clip(1.0 - d / core, 0.0, 1.0)
+    rgb = np.asarray(color, dtype=float) + (255.0 - np.asarray(color, dtype=float)) * whiteness[..., np.newaxis]
+
+    surface = pygame.Surface((size, size), pygame.SRCALPHA)
+    pixels = pygame.surfarray.pixels3d(surface)
+    pixels[...] = rgb.astype(np.uint8)
+    del pixels
+    alphas = pygame.surfarray.pixels_alpha(surface)
+    alphas[...] = (alpha * 255).astype(np.uint8)
+    del alphas
+    if pygame.display.get_surface() is not None:
+        surface = surface.convert_alpha()
+    return surface, half
+
+class StarAtlas:
+    """Pre-rendered star sprites bucketed by magnitude and colour.
+
+    Sprite radii step by `radius_step` pixels between the smallest and
+    largest star size, all times `scale`. Each size comes in `color_buckets`
+    colours spread over the B-V range plus one in `color` for stars without
+    a colour index. Drawing a frame is then one Surface.blits() call over
+    the list from blit_list().
+    """
+
+    def __init__(self, scale=1.0, color=(255, 255, 255), color_buckets=8,
+                 radius_step=0.5, glow=True):
+        self.scale = scale
+        self.radius_step = radius_step * scale
+        self.color_buckets = color_buckets
+        self.radii = np.arange(MIN_RADIUS, MAX_RADIUS + radius_step / 2, radius_step) * scale
+        self.bucket_bv = np.linspace(BV_ANCHORS[0], BV_ANCHORS[-1], color_buckets)
+        colors = list(bv_to_rgb(self.bucket_bv)) + [color]
+
+        # Sprite (size i, colour j) is at index i * len(colors) + j
+        sprites = []
+        halves = []
+        for radius in self.radii:
+            for rgb in colors:
+                surface, half = _render_sprite(radius, rgb, glow and radius >= GLOW_MIN_RADIUS * scale)
+                sprites.append(surface)
+                halves.append(half)
+        self._sprites = np.empty(len(sprites), dtype=object)
+        self._sprites[:] = sprites
+        self._halves = np.array(halves, dtype=int)
+        self._colors = len(colors)
+
+    def __len__(self):
+        return len(self._sprites)
+
+    @property
+    def max_extent(self):
+        """Largest distance in pixels a sprite reaches from its centre."""
+        return int(self._halves.max())
+
+    def sprite_ids(self, mag, bv=None):
+        """Sprite index for each star from its magnitude and optional B-V."""
+        radius = star_radius(mag, self.scale)
+        size = np.clip(np.rint((radius - self.radii[0]) / self.radius_step), 0, len(self.radii) - 1)
+        color = np.full(len(size), self.color_buckets)
+        if bv is not None:
+            bv = np.asarray(bv, dtype=float)
+            known = np.isfinite(bv)
+            step = (self.bucket_bv[-1] - self.bucket_bv[0]) / max(self.color_buckets - 1, 1)
+            bucket = np.rint((np.clip(bv[known], self.bucket_bv[0], self.bucket_bv[-1]) - self.bucket_bv[0]) / step)
+            color[known] = bucket
+        return size.astype(int) * self._colors + color.astype(int)
+
+    def blit_list(self, ids, xs, ys):
+        """(sprite, top-left) pairs centring sprites `ids` on the given points."""
+        halves = self._halves[ids]
+        return list(zip(self._sprites[ids].tolist(), zip((xs - halves).tolist(), (ys - halves).tolist())))
@@ -0,0 +1,45 @@
+import os
+
+import numpy as np
+import pytest
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+CATALOG = os.path.join(BASE_DIR, 'data', 'star_catalog.csv')
+
+@pytest.fixture(scope='session')
+def ephemeris():
+    """The planetary ephemeris; tests needing it are skipped when it is not installed."""
+    pytest.importorskip('skyfield')
+    from astro_logic import get_ephemeris
+
+    try:
+        return get_ephemeris()
+    except FileNotFoundError as e:
+        pytest.skip(str(e))
+
+@pytest.fixture(scope='session')
+def catalog(ephemeris):
+    from astro_logic import load_star_catalog
+
+    return load_star_catalog(CATALOG)
+
+@pytest.fixture(scope='session')
+def ts():
+    from astro_logic import get_timescale
+
+    return get_timescale()
+
+@pytest.fixture(scope='session')
+def skyfield_altaz(ephemeris):
+    """Reference (alt, az) in degrees of one catalog star, straight from Skyfield."""
+    from skyfield.api import Star
+
+    def altaz(observer, time, ra_hours, dec_degrees):
+        star = Star(ra_hours=float(ra_hours), dec_degrees=float(dec_degrees))
+        alt, az, _ = (ephemeris['earth'] + observer).at(time).observe(star).apparent().altaz()
+        return alt.degrees, az.degrees
+    return altaz
+
+def angle_difference(a, b):
+    """Absolute difference in degrees between two azimuths, across 0/360."""
+    return np.abs((np.asarray(a) - np.asarray(b) + 180.0) % 360.0 - 180.0)
@@ -0,0 +1,45 @@
+import pytest
+
+from conftest import angle_difference
+
+from astro_logic import (POSITION_TOLERANCE_DEG, calculate_star_positions_over_time,
+                         max_batch_deviation)
+
+@pytest.fixture
+def observer():
+    from skyfield.api import Topos
+
+    return Topos(latitude_degrees=52.23, longitude_degrees=21.01)
+
+@pytest.mark.parametrize('latitude, longitude', [(52.23, 21.01), (-33.87, 151.21), (89.9, 0.0)])
+def test_batch_positions_match_per_star_path(catalog, ts, latitude, longitude):
+    from skyfield.api import Topos
+
+    observer = Topos(latitude_degrees=latitude, longitude_degrees=longitude)
+    time = ts.utc(2015, 3, 2, 20)
+    assert max_batch_deviation(catalog, observer, time) <= POSITION_TOLERANCE_DEG
+
+def test_batch_deviation_pairs_rows_not_names(catalog, ts, observer):
+    # Every name repeated and one left blank: matching by name would compare
+    # stars at different coordinates
+    repeated = catalog.copy()
+    repeated['name'] = 'Star'
+    repeated.loc[0, 'name'] = ''
+    time = ts.utc(2015, 3, 2, 20)
+    assert max_batch_deviation(repeated, observer, time) <= POSITION_TOLERANCE_DEG
+
+def test_positions_over_time_match_skyfield(catalog, ts, observer, skyfield_altaz):
+    times = ts.utc(2015, 3, 2, 18, range(0, 600, 90))
+    result = calculate_star_positions_over_time(catalog, observer, times)
+    assert result['alt'].shape == (len(catalog), len(times))
+    assert not result['failed']
+
+    for i in range(len(catalog)):
+        for j in range(len(times)):
+            alt, az = skyfield_altaz(observer, times[j], catalog['ra'][i], catalog['dec'][i])
+            assert abs(result['alt'][i, j] - alt) <= POSITION_TOLERANCE_DEG
+            assert angle_difference(result['az'][i, j], az) <= POSITION_TOLERANCE_DEG
+
+def test_positions_over_time_rejects_a_single_time(catalog, ts, observer):
+    with pytest.raises(ValueError):
+        calculate_star_positions_over_time(catalog, observer, ts.utc(2015, 3, 2, 20))
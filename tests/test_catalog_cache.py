@@ -0,0 +1,95 @@
+import json
+import os
+import shutil
+
+import numpy as np
+import pytest
+
+import catalog_cache
+from catalog_cache import CompiledCatalog, MANIFEST_NAME, cache_dir_for, open_star_catalog
+from conftest import CATALOG
+
+@pytest.fixture
+def csv_path(tmp_path):
+    path = tmp_path / 'stars.csv'
+    shutil.copy(CATALOG, path)
+    return str(path)
+
+@pytest.fixture
+def compiles(monkeypatch):
+    """Count the compile_catalog calls made while opening catalogs."""
+    calls = []
+    compile_catalog = catalog_cache.compile_catalog
+
+    def counting(*args, **kwargs):
+        calls.append(args)
+        return compile_catalog(*args, **kwargs)
+    monkeypatch.setattr(catalog_cache, 'compile_catalog', counting)
+    return calls
+
+def _append_star(csv_path, line):
+    with open(csv_path, 'a') as f:
+        f.write(line + '\n')
+
+def test_cache_is_reused_when_unchanged(csv_path, compiles):
+    first = open_star_catalog(csv_path)
+    second = open_star_catalog(csv_path)
+    assert isinstance(second, CompiledCatalog)
+    assert len(compiles) == 1
+    assert list(second['name']) == list(first['name'])
+
+def test_edited_csv_is_recompiled(csv_path, compiles):
+    before = open_star_catalog(csv_path)
+    _append_star(csv_path, 'Deneb,20.6905,45.2803,1.25')
+    after = open_star_catalog(csv_path)
+    assert len(compiles) == 2
+    assert len(after) == len(before) + 1
+    assert after['name'][-1] == 'Deneb'
+    assert after.manifest['source_sha256'] != before.manifest['source_sha256']
+
+def test_touched_csv_with_same_content_is_not_recompiled(csv_path, compiles):
+    open_star_catalog(csv_path)
+    stat = os.stat(csv_path)
+    os.utime(csv_path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10 ** 9))
+    catalog = open_star_catalog(csv_path)
+    assert len(compiles) == 1
+    # The new mtime is recorded, so the next open skips hashing the file
+    assert catalog.manifest['source_mtime_ns'] == os.stat(csv_path).st_mtime_ns
+
+def test_other_filters_recompile(csv_path, compiles):
+    everything = open_star_catalog(csv_path)
+    bright = open_star_catalog(csv_path, max_magnitude=0.1)
+    assert len(compiles) == 2
+    assert len(bright) < len(everything)
+    assert np.all(np.asarray(bright['mag']) <= 0.1)
+
+def test_partial_cache_without_manifest_is_rebuilt(csv_path, compiles):
+    cache_dir = cache_dir_for(csv_path)
+    os.makedirs(cache_dir)
+    # Column files from an interrupted build, but no manifest
+    np.save(os.path.join(cache_dir, 'mag.npy'), np.zeros(3))
+    with open(os.path.join(cache_dir, MANIFEST_NAME + '.tmp'), 'w') as f:
+        f.write('{"version"')
+    catalog = open_star_catalog(csv_path)
+    assert len(compiles) == 1
+    assert isinstance(catalog, CompiledCatalog)
+    # Not the 3-row column left behind
+    assert len(catalog['mag']) == len(catalog) > 3
+
+def test_stale_cache_format_is_not_read(csv_path, compiles):
+    open_star_catalog(csv_path)
+    manifest_path = os.path.join(cache_dir_for(csv_path), MANIFEST_NAME)
+    with open(manifest_path) as f:
+        manifest = json.load(f)
+    manifest['version'] -= 1
+    with open(manifest_path, 'w') as f:
+        json.dump(manifest, f)
+    catalog = open_star_catalog(csv_path)
+    assert len(compiles) == 2
+    assert catalog.manifest['version'] == catalog_cache.CACHE_FORMAT_VERSION
+
+def test_rebuild_leaves_no_temporary_directories(csv_path):
+    open_star_catalog(csv_path)
+    _append_star(csv_path, 'Deneb,20.6905,45.2803,1.25')
+    open_star_catalog(csv_path)
+    assert sorted(os.listdir(os.path.dirname(csv_path))) == ['stars.cache', 'stars.csv']
@@ -0,0 +1,35 @@
+import numpy as np
+import pytest
+
+from conftest import angle_difference
+
+from incremental_sky import IncrementalSky
+
+ARCSEC = 1 / 3600.0
+
+@pytest.mark.parametrize('minutes', [5, 30, 120, 600])
+def test_incremental_positions_stay_within_error_bound(catalog, ts, skyfield_altaz, minutes):
+    from skyfield.api import Topos
+
+    observer = Topos(latitude_degrees=52.23, longitude_degrees=21.01)
+    sky = IncrementalSky(catalog, observer, max_error_arcsec=1.0)
+    sky.positions_at(ts.utc(2015, 3, 2, 20))
+    time = ts.utc(2015, 3, 2, 20, minutes)
+    stars = sky.positions_at(time)
+    assert sky.incremental_updates == 1 and sky.full_recomputes == 1
+
+    for i in range(len(catalog)):
+        alt, az = skyfield_altaz(observer, time, catalog['ra'][i], catalog['dec'][i])
+        j = stars.index_of(catalog['name'][i])
+        assert abs(stars.alt[j] - alt) <= sky.max_error_arcsec * ARCSEC
+        # Azimuth errors shrink towards the zenith, so compare on-sky distance
+        assert angle_difference(stars.az[j], az) * np.cos(np.radians(alt)) <= sky.max_error_arcsec * ARCSEC
+
+def test_large_time_step_recomputes(catalog, ts):
+    from skyfield.api import Topos
+
+    sky = IncrementalSky(catalog, Topos(latitude_degrees=52.23, longitude_degrees=21.01),
+                         max_interval_days=1.0)
+    sky.positions_at(ts.utc(2015, 3, 2, 20))
+    sky.positions_at(ts.utc(2015, 3, 4, 20))
+    assert sky.full_recomputes == 2 and sky.incremental_updates == 0
@@ -0,0 +1,25 @@
+import multiprocessing
+import uuid
+
+import pytest
+
+from utils import logger as logger_module
+from utils.logger import setup_logger
+
+def _log_line(message):
+    setup_logger().info(message)
+
+def _log_file():
+    return logger_module._listener.handlers[0].baseFilename
+
+@pytest.mark.skipif('fork' not in multiprocessing.get_all_start_methods(),
+                    reason="fork is not available on this platform")
+def test_forked_child_records_reach_the_log_file():
+    setup_logger()
+    message = f"forked child {uuid.uuid4().hex}"
+    child = multiprocessing.get_context('fork').Process(target=_log_line, args=(message,))
+    child.start()
+    child.join(timeout=30)
+    assert child.exitcode == 0
+    with open(_log_file(), 'r') as f:
+        assert message in f.read()
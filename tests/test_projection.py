@@ -0,0 +1,36 @@
+import numpy as np
+
+from conftest import angle_difference
+
+from projection import horizon_crossing, project
+
+def unit_vectors(az, alt):
+    az, alt = np.radians(az), np.radians(alt)
+    return np.stack([np.cos(alt) * np.cos(az), np.cos(alt) * np.sin(az), np.sin(alt)], axis=-1)
+
+def test_horizon_crossing_lies_on_the_arc_between_the_points():
+    rng = np.random.default_rng(0)
+    az0, az1 = rng.uniform(0.0, 360.0, (2, 200))
+    alt0 = rng.uniform(0.5, 89.0, 200)
+    alt1 = -rng.uniform(0.5, 89.0, 200)
+
+    az, alt = horizon_crossing(az0, alt0, az1, alt1)
+
+    assert np.all(alt == 0.0)
+    p0, p1, c = unit_vectors(az0, alt0), unit_vectors(az1, alt1), unit_vectors(az, alt)
+    # On the great circle through both points...
+    assert np.allclose(np.einsum('ij,ij->i', np.cross(p0, p1), c), 0.0, atol=1e-12)
+    # ...and on the shorter arc between them
+    separation = np.arccos(np.clip(np.einsum('ij,ij->i', p0, p1), -1.0, 1.0))
+    via_crossing = (np.arccos(np.clip(np.einsum('ij,ij->i', p0, c), -1.0, 1.0))
+                    + np.arccos(np.clip(np.einsum('ij,ij->i', c, p1), -1.0, 1.0)))
+    assert np.allclose(via_crossing, separation)
+
+def test_horizon_crossing_is_symmetric_and_on_the_orthographic_limb():
+    az, alt = horizon_crossing(350.0, 10.0, 10.0, -10.0)
+    az_reversed, _ = horizon_crossing(10.0, -10.0, 350.0, 10.0)
+
+    assert angle_difference(az, az_reversed) < 1e-9
+    assert angle_difference(az, 0.0) < 1e-9
+    x, y = project(az, alt, 'orthographic')
+    assert np.isclose(np.hypot(x, y), 1.0)
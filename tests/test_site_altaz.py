@@ -0,0 +1,31 @@
+import numpy as np
+
+from conftest import angle_difference
+
+from astro_logic import calculate_site_altaz, calculate_site_visibility
+
+# Sites share the geocentric star directions, which ignores diurnal
+# aberration (under 0.33"), and results are stored as float32
+SITE_TOLERANCE_DEG = 1 / 3600.0
+LATITUDES = np.array([52.23, -33.87, 0.0, 78.2, -89.0])
+LONGITUDES = np.array([21.01, 151.21, -78.5, 15.6, 0.0])
+
+def test_site_altaz_matches_skyfield(catalog, ts, skyfield_altaz):
+    from skyfield.api import Topos
+
+    time = ts.utc(2015, 3, 2, 20)
+    result = calculate_site_altaz(catalog, LATITUDES, LONGITUDES, time, max_elements=7)
+    assert result['alt'].shape == (len(LATITUDES), len(catalog))
+
+    for s, (latitude, longitude) in enumerate(zip(LATITUDES, LONGITUDES)):
+        observer = Topos(latitude_degrees=latitude, longitude_degrees=longitude)
+        for i in range(len(catalog)):
+            alt, az = skyfield_altaz(observer, time, catalog['ra'][i], catalog['dec'][i])
+            assert abs(result['alt'][s, i] - alt) <= SITE_TOLERANCE_DEG
+            assert angle_difference(result['az'][s, i], az) * np.cos(np.radians(alt)) <= SITE_TOLERANCE_DEG
+
+def test_site_visibility_agrees_with_altitudes(catalog, ts):
+    time = ts.utc(2015, 3, 2, 20)
+    altaz = calculate_site_altaz(catalog, LATITUDES, LONGITUDES, time)
+    visibility = calculate_site_visibility(catalog, LATITUDES, LONGITUDES, time, min_altitude=10.0)
+    np.testing.assert_array_equal(visibility['visible'], altaz['alt'] > 10.0)
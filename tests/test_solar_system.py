@@ -0,0 +1,53 @@
+import numpy as np
+import pytest
+
+from conftest import angle_difference
+
+from solar_system import BODIES, SUN_MAGNITUDE, calculate_body_positions
+
+POSITION_TOLERANCE_DEG = 1e-6
+# Phases are topocentric; the almanac's are geocentric, which moves the
+# Moon's illuminated fraction by up to about 0.002
+PHASE_TOLERANCE = 0.005
+
+@pytest.fixture
+def observer():
+    from skyfield.api import Topos
+
+    return Topos(latitude_degrees=52.23, longitude_degrees=21.01)
+
+def test_bodies_match_skyfield(ephemeris, ts, observer):
+    from skyfield import almanac
+    from skyfield.magnitudelib import planetary_magnitude
+
+    time = ts.utc(2015, 3, 2, 20)
+    result = calculate_body_positions(observer, time)
+    site = (ephemeris['earth'] + observer).at(time)
+
+    for i, (name, target) in enumerate(BODIES):
+        observation = site.observe(ephemeris[target])
+        alt, az, distance = observation.apparent().altaz()
+        assert result['name'][i] == name
+        assert abs(result['alt'][i] - alt.degrees) <= POSITION_TOLERANCE_DEG
+        assert angle_difference(result['az'][i], az.degrees) <= POSITION_TOLERANCE_DEG
+        assert result['distance_au'][i] == pytest.approx(distance.au)
+        if name == 'Sun':
+            assert result['mag'][i] == SUN_MAGNITUDE
+        elif name != 'Moon':
+            # NaN where Skyfield has no magnitude model for the geometry
+            assert result['mag'][i] == pytest.approx(planetary_magnitude(observation), nan_ok=True)
+            fraction = almanac.fraction_illuminated(ephemeris, target, time)
+            assert abs(result['phase'][i] - fraction) <= PHASE_TOLERANCE
+
+    moon = [name for name, _ in BODIES].index('Moon')
+    assert abs(result['phase'][moon] - almanac.fraction_illuminated(ephemeris, 'moon', time)) <= PHASE_TOLERANCE
+    # Two days before full moon: bright, but fainter than at full (-12.7)
+    assert -12.7 < result['mag'][moon] < -11.0
+
+def test_vector_times_match_single_times(ephemeris, ts, observer):
+    times = ts.utc(2015, 3, 2, 20, [0, 60, 120])
+    vector = calculate_body_positions(observer, times)
+    for j in range(len(times)):
+        single = calculate_body_positions(observer, times[j])
+        np.testing.assert_allclose(vector['alt'][:, j], single['alt'], atol=POSITION_TOLERANCE_DEG)
+        np.testing.assert_allclose(vector['mag'][:, j], single['mag'])
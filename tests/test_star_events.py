@@ -0,0 +1,46 @@
+import numpy as np
+import pytest
+
+from star_events import calculate_star_events, select_events
+
+# The closed form works from the apparent places at the window start, so
+# allow a few seconds against Skyfield's root finding
+EVENT_TOLERANCE_SECONDS = 5.0
+SECONDS_PER_DAY = 86400.0
+
+def _first_event(times, events, wanted):
+    matches = [time.tt for time, event in zip(times, events) if event == wanted]
+    return matches[0] if matches else np.nan
+
+@pytest.mark.parametrize('latitude, longitude', [(52.23, 21.01), (-33.87, 151.21)])
+def test_events_match_skyfield_almanac(catalog, ts, ephemeris, latitude, longitude):
+    from skyfield import almanac
+    from skyfield.api import Star, Topos
+
+    observer = Topos(latitude_degrees=latitude, longitude_degrees=longitude)
+    start, end = ts.utc(2015, 3, 2, 12), ts.utc(2015, 3, 3, 12)
+    events = calculate_star_events(catalog, observer, start, end)
+
+    for i in range(len(catalog)):
+        star = Star(ra_hours=float(catalog['ra'][i]), dec_degrees=float(catalog['dec'][i]))
+        times, kinds = almanac.find_discrete(start, end, almanac.risings_and_settings(ephemeris, star, observer))
+        transits, sides = almanac.find_discrete(start, end, almanac.meridian_transits(ephemeris, star, observer))
+        expected = {
+            'rise': _first_event(times, kinds, 1),
+            'set': _first_event(times, kinds, 0),
+            'transit': _first_event(transits, sides, 1)
+        }
+        for column, tt in expected.items():
+            if np.isnan(tt):
+                assert np.isnan(events[column][i])
+            else:
+                assert abs(events[column][i] - tt) * SECONDS_PER_DAY <= EVENT_TOLERANCE_SECONDS
+
+def test_select_events_filters_by_altitude_and_magnitude(catalog, ts):
+    from skyfield.api import Topos
+
+    observer = Topos(latitude_degrees=52.23, longitude_degrees=21.01)
+    events = calculate_star_events(catalog, observer, ts.utc(2015, 3, 2, 18), ts.utc(2015, 3, 3, 4))
+    selected = select_events(events, min_altitude=20.0, max_magnitude=0.2)
+    assert len(selected['name'])
+    assert (selected['max_alt'] >= 20.0).all() and (selected['mag'] <= 0.2).all()
@@ -0,0 +1,45 @@
+from collections import OrderedDict
+
+class TextCache:
+    """Bounded LRU cache of rendered text surfaces.
+
+    Keyed by (text, color, font, antialias), so a label that is drawn every
+    frame is rendered once and then only blitted. Returned surfaces are
+    shared between callers and must not be drawn on.
+    """
+
+    def __init__(self, max_entries=1024):
+        self.max_entries = max_entries
+        self._surfaces = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def render(self, font, text, color, antialias=True):
+        """Return a surface for `text`, rendering it only on a cache miss."""
+        key = (str(text), tuple(color), font, antialias)
+        surface = self._surfaces.get(key)
+        if surface is not None:
+            self._surfaces.move_to_end(key)
+            self.hits += 1
+            return surface
+
+        self.misses += 1
+        surface = font.render(key[0], antialias, color)
+        self._surfaces[key] = surface
+        if len(self._surfaces) > self.max_entries:
+            self._surfaces.popitem(last=False)
+        return surface
+
+    def clear(self):
+        """Drop every cached surface, e.g. after the font changes."""
+        self._surfaces.clear()
+
+    def stats(self):
+        """Return hit/miss counters and the current size."""
+        lookups = self.hits + self.misses
+        return {
+            'entries': len(self._surfaces),
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': self.hits / lookups if lookups else 0.0
+        }
@@ -1,22 +1,112 @@
+import atexit
 import logging
 import os
+import queue
+import threading
+import time
+from collections import OrderedDict
 from datetime import datetime
+from logging.handlers import QueueHandler, QueueListener
 
-def setup_logger():
-    """Configure and return a logger instance."""
+_setup_lock = threading.Lock()
+_listener = None
+_handler = None  # the handler setup_logger() attached to the logger
+LOGGER_NAME = 'PlanetariumLogger'
+
+class RateLimitFilter(logging.Filter):
+    """Drop repeats of the same message logged within `interval` seconds.
+
+    Messages are grouped by the record's `rate_key` attribute (pass it via
+    ``extra={'rate_key': ...}`` for messages whose text varies) or else by
+    the message itself. The first message in a group passes through. The
+    next one after the interval notes how many were suppressed in between.
+    """
+
+    def __init__(self, interval=10.0, max_keys=1024):
+        super().__init__()
+        self.interval = interval
+        self.max_keys = max_keys
+        self._seen = OrderedDict()  # key -> [last emitted time, suppressed count]
+        self._lock = threading.Lock()
+
+    def filter(self, record):
+        key = (record.levelno, getattr(record, 'rate_key', None) or str(record.msg))
+        now = time.monotonic()
+        with self._lock:
+            entry = self._seen.get(key)
+            if entry is not None and now - entry[0] < self.interval:
+                entry[1] += 1
+                return False
+
+            suppressed = entry[1] if entry is not None else 0
+            self._seen[key] = [now, 0]
+            self._seen.move_to_end(key)
+            if len(self._seen) > self.max_keys:
+                self._seen.popitem(last=False)
+
+        if suppressed:
+            record.msg = f"{record.msg} (suppressed {suppressed} repeats)"
+        return True
+
+def _file_handler():
     log_dir = 'logs'
     if not os.path.exists(log_dir):
         os.makedirs(log_dir)
 
     log_file = os.path.join(log_dir, f'planetarium_{datetime.now().strftime("%Y%m%d")}.log')
-    
-    logger = logging.getLogger('PlanetariumLogger')
-    logger.setLevel(logging.INFO)
-    
-    formatter = logging.Formatter('%(asctime)s - %(levelname)s - %(message)s')
-    
+
     file_handler = logging.FileHandler(log_file)
-    file_handler.setFormatter(formatter)
-    logger.addHandler(file_handler)
-    
+    file_handler.setFormatter(logging.Formatter('%(asctime)s - %(levelname)s - %(message)s'))
+    return file_handler
+
+def setup_logger():
+    """Configure and return a logger instance.
+
+    Safe to call any number of times; handlers are only attached once.
+    Records are rate-limited, then queued, and a background thread writes
+    them to disk, so logging from the render loop never waits on file I/O.
+    """
+    global _listener, _handler
+    logger = logging.getLogger(LOGGER_NAME)
+
+    with _setup_lock:
+        if _handler is not None:
+            return logger
+
+        logger.setLevel(logging.INFO)
+
+        log_queue = queue.Queue(-1)
+        _handler = QueueHandler(log_queue)
+        _handler.addFilter(RateLimitFilter())
+        logger.addHandler(_handler)
+
+        _listener = QueueListener(log_queue, _file_handler(), respect_handler_level=True)
+        _listener.start()
+        # Flush whatever is still queued when the interpreter exits
+        atexit.register(_listener.stop)
+
     return logger
+
+def _after_fork_in_child():
+    """Write a forked child's records straight to the file.
+
+    The child inherits the QueueHandler but not the listener thread that
+    drains its queue, so anything it logged would be silently dropped.
+    Worker processes are not drawing frames, so writing synchronously there
+    is fine, and nothing is left queued when they exit.
+    """
+    global _setup_lock, _listener, _handler
+    _setup_lock = threading.Lock()  # may have been held by a parent thread
+    if _handler is None:
+        return
+    logger = logging.getLogger(LOGGER_NAME)
+    logger.removeHandler(_handler)
+    if _listener is not None:
+        atexit.unregister(_listener.stop)
+        _listener = None
+    _handler = _file_handler()
+    _handler.addFilter(RateLimitFilter())
+    logger.addHandler(_handler)
+
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=_after_fork_in_child)
@@ -0,0 +1,134 @@
+import cProfile
+import io
+import os
+import pstats
+import time
+from collections import deque
+from contextlib import contextmanager
+from datetime import datetime
+from functools import wraps
+
+import numpy as np
+
+class RollingStats:
+    """Durations of the most recent `size` samples, with percentile summaries."""
+
+    def __init__(self, size=600):
+        self.samples = deque(maxlen=size)
+        self.count = 0
+
+    def add(self, seconds):
+        self.samples.append(seconds)
+        self.count += 1
+
+    def percentiles(self):
+        """Return p50/p95/p99 in milliseconds, or None before the first sample."""
+        if not self.samples:
+            return None
+        p50, p95, p99 = np.percentile(np.fromiter(self.samples, dtype=float), [50, 95, 99])
+        return {'p50': p50 * 1000, 'p95': p95 * 1000, 'p99': p99 * 1000}
+
+class PerfMonitor:
+    """Frame and stage timings for the render loop.
+
+    Frames are timed with frame_start()/frame_end() and stages with the
+    stage() context manager; each keeps a rolling window of samples.
+    Summaries can be logged periodically, and a cProfile capture can be
+    armed for a number of frames.
+    """
+
+    def __init__(self, history=600, summary_interval=60.0, log_dir='logs'):
+        self.history = history
+        self.summary_interval = summary_interval
+        self.log_dir = log_dir
+        self.frames = RollingStats(history)
+        self.stages = {}
+        self.overlay_visible = False
+        self._frame_start = None
+        self._last_summary = time.perf_counter()
+        self._profiler = None
+        self._profile_frames_left = 0
+
+    @contextmanager
+    def stage(self, name):
+        """Time the enclosed block as one sample of stage `name`."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            stats = self.stages.get(name)
+            if stats is None:
+                stats = self.stages[name] = RollingStats(self.history)
+            stats.add(time.perf_counter() - start)
+
+    def timed(self, name):
+        """Decorator form of stage() for functions and methods."""
+        def decorator(fn):
+            @wraps(fn)
+            def wrapper(*args, **kwargs):
+                with self.stage(name):
+                    return fn(*args, **kwargs)
+            return wrapper
+        return decorator
+
+    def frame_start(self):
+        self._frame_start = time.perf_counter()
+
+    def frame_end(self, logger=None):
+        """Record the frame time and handle periodic summaries and profiling."""
+        if self._frame_start is None:
+            return
+        now = time.perf_counter()
+        self.frames.add(now - self._frame_start)
+        self._frame_start = None
+
+        if self._profiler is not None:
+            self._profile_frames_left -= 1
+            if self._profile_frames_left <= 0:
+                self._finish_profile(logger)
+
+        if logger is not None and now - self._last_summary >= self.summary_interval:
+            self._last_summary = now
+            for line in self.summary_lines():
+                logger.info(f"Performance - {line}")
+
+    def toggle_overlay(self):
+        self.overlay_visible = not self.overlay_visible
+
+    def summary_lines(self):
+        """One line for the frame times and one per stage, in milliseconds."""
+        lines = []
+        # list() first: the worker thread may add a stage while we iterate
+        for name, stats in [('frame', self.frames)] + sorted(list(self.stages.items())):
+            p = stats.percentiles()
+            if p is not None:
+                lines.append(f"{name}: p50 {p['p50']:.2f} p95 {p['p95']:.2f} "
+                             f"p99 {p['p99']:.2f} ms (n={stats.count})")
+        return lines
+
+    @property
+    def profiling(self):
+        return self._profiler is not None
+
+    def start_profile(self, frames, logger=None):
+        """Profile the next `frames` frames with cProfile."""
+        if self._profiler is not None:
+            return
+        self._profiler = cProfile.Profile()
+        self._profile_frames_left = frames
+        self._profiler.enable()
+        if logger is not None:
+            logger.info(f"Profiling the next {frames} frames")
+
+    def _finish_profile(self, logger):
+        profiler, self._profiler = self._profiler, None
+        profiler.disable()
+        if not os.path.exists(self.log_dir):
+            os.makedirs(self.log_dir)
+        path = os.path.join(self.log_dir, f'profile_{datetime.now().strftime("%Y%m%d_%H%M%S")}.prof')
+        profiler.dump_stats(path)
+
+        if logger is not None:
+            summary = io.StringIO()
+            pstats.Stats(profiler, stream=summary).sort_stats('cumulative').print_stats(15)
+            logger.info(f"Profile saved to {path}\n{summary.getvalue()}")
@@ -0,0 +1,39 @@
+import time
+from contextlib import contextmanager
+
+class StartupTimer:
+    """Record how long each startup phase takes, up to the first frame."""
+
+    def __init__(self):
+        self.start = time.perf_counter()
+        self.phases = []
+        self.finished = False
+
+    @contextmanager
+    def phase(self, name):
+        """Time the enclosed block as a named phase."""
+        phase_start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.phases.append((name, time.perf_counter() - phase_start))
+
+    def total(self):
+        """Seconds elapsed since the timer was created."""
+        return time.perf_counter() - self.start
+
+    def report(self):
+        """Return the per-phase breakdown as printable lines."""
+        lines = [f"{name}: {seconds * 1000:.1f} ms" for name, seconds in self.phases]
+        lines.append(f"Time to first frame: {self.total() * 1000:.1f} ms")
+        return lines
+
+    def finish(self, logger=None):
+        """Print and log the breakdown once, when the first frame is shown."""
+        if self.finished:
+            return
+        self.finished = True
+        for line in self.report():
+            print(f"Startup - {line}")
+            if logger is not None:
+                logger.info(f"Startup - {line}")